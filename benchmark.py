@@ -0,0 +1,4 @@
+from llm_orchestrator.commands.benchmark import main
+
+if __name__ == "__main__":
+    main()
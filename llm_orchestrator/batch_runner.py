@@ -0,0 +1,212 @@
+import hashlib
+import json
+import os
+import re
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+# prompt_12.txt, answer_12.json, prediction_12.json -> 12
+ITEM_ID_PATTERN = re.compile(r"_(\d+)\.\w+$")
+
+
+def item_id(file_name: str) -> Optional[str]:
+    match = ITEM_ID_PATTERN.search(file_name)
+    return match.group(1) if match is not None else None
+
+
+def parse_shard(shard: str) -> tuple[int, int]:
+    # "i/N" -> (i, N), e.g. "0/4" is the first of four shards
+    try:
+        index, count = (int(part) for part in shard.split("/"))
+    except ValueError:
+        raise ValueError(f"Shard must be given as i/N, got {shard!r}")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Shard index must be in [0, N), got {shard!r}")
+    return index, count
+
+
+class WorkManifest:
+    # Work items and their state, kept in SQLite so that any number of processes, possibly on
+    # different machines sharing the storage, can claim and commit items atomically.
+    # Items are spread over shards by a hash of their ID
+    def __init__(self, path: str, stale_after: float = 3600.0, max_attempts: int = 3):
+        self.path = path
+        # Claims older than stale_after seconds are assumed to belong to a crashed process
+        self.stale_after = stale_after
+        self.max_attempts = max_attempts
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # The default rollback journal is used rather than WAL, which does not work on network file systems.
+        # The connection is shared by the threads of the process (e.g. the BatchExecutor workers
+        # committing their task lists), the lock keeps their transactions apart
+        self._connection = sqlite3.connect(path, isolation_level=None, timeout=60, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS items (id TEXT PRIMARY KEY, payload TEXT NOT NULL, bucket INTEGER NOT NULL, "
+            "status TEXT NOT NULL, owner TEXT, claimed_at REAL, attempts INTEGER NOT NULL, error TEXT)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS items_status ON items (status)")
+
+    def add(self, items: Iterable[tuple[str, Any]]) -> int:
+        # Items already in the manifest are left untouched, so it can be refreshed on every start
+        rows = [
+            (item_id, json.dumps(payload), int(hashlib.sha256(item_id.encode("utf-8")).hexdigest()[:8], 16))
+            for item_id, payload in items
+        ]
+        with self._transaction():
+            before = self._connection.total_changes
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO items (id, payload, bucket, status, attempts) VALUES (?, ?, ?, 'pending', 0)",
+                rows,
+            )
+            return self._connection.total_changes - before
+
+    def claim(self, owner: str, shard: tuple[int, int] = (0, 1), n: int = 1) -> list[tuple[str, Any]]:
+        index, count = shard
+        now = time.time()
+        with self._transaction():
+            rows = self._connection.execute(
+                "SELECT id, payload FROM items WHERE bucket % ? = ? "
+                "AND (status = 'pending' OR (status = 'claimed' AND claimed_at < ?)) ORDER BY id LIMIT ?",
+                (count, index, now - self.stale_after, n),
+            ).fetchall()
+            self._connection.executemany(
+                "UPDATE items SET status = 'claimed', owner = ?, claimed_at = ?, attempts = attempts + 1 WHERE id = ?",
+                [(owner, now, item_id) for item_id, _ in rows],
+            )
+        return [(item_id, json.loads(payload)) for item_id, payload in rows]
+
+    def commit(self, item_id: str, owner: str, write: Optional[Callable[[], None]] = None) -> bool:
+        # write, if given, stores the result while the manifest is locked. Returns False if the
+        # claim was lost (it went stale and another process took the item)
+        with self._transaction():
+            row = self._connection.execute("SELECT owner, status FROM items WHERE id = ?", (item_id,)).fetchone()
+            if row is None or row != (owner, "claimed"):
+                return False
+            if write is not None:
+                write()
+            self._connection.execute("UPDATE items SET status = 'done', error = NULL WHERE id = ?", (item_id,))
+        return True
+
+    def fail(self, item_id: str, owner: str, error: str) -> None:
+        # The item goes back to the queue until it has failed max_attempts times
+        with self._transaction():
+            self._connection.execute(
+                "UPDATE items SET status = CASE WHEN attempts < ? THEN 'pending' ELSE 'failed' END, error = ? "
+                "WHERE id = ? AND owner = ? AND status = 'claimed'",
+                (self.max_attempts, error, item_id, owner),
+            )
+
+    def release(self, owner: str, item_ids: Optional[Iterable[str]] = None) -> int:
+        # Returns the items claimed by owner (all of them, or just item_ids) to the queue, e.g. when a
+        # run is interrupted. They were not really attempted, so they do not count towards max_attempts
+        query = (
+            "UPDATE items SET status = 'pending', owner = NULL, claimed_at = NULL, attempts = attempts - 1 "
+            "WHERE owner = ? AND status = 'claimed'"
+        )
+        with self._transaction():
+            before = self._connection.total_changes
+            if item_ids is None:
+                self._connection.execute(query, (owner,))
+            else:
+                self._connection.executemany(query + " AND id = ?", [(owner, item_id) for item_id in item_ids])
+            return self._connection.total_changes - before
+
+    def counts(self, shard: tuple[int, int] = (0, 1)) -> dict[str, int]:
+        index, count = shard
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT status, COUNT(*) FROM items WHERE bucket % ? = ? GROUP BY status", (count, index)
+            ).fetchall()
+        return dict(rows)
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    @contextmanager
+    def _transaction(self):
+        # BEGIN IMMEDIATE takes the write lock upfront, so two processes never claim the same item
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+
+
+class BatchRunner:
+    # Claims the items of one shard from the manifest, and appends each result to a JSONL output as
+    # {"id": ..., "result": ...} when it is committed. Crashed runs are resumed by running again
+    def __init__(
+        self,
+        manifest: WorkManifest,
+        output_path: str,
+        shard: tuple[int, int] = (0, 1),
+        owner: Optional[str] = None,
+    ):
+        self.manifest = manifest
+        self.output_path = output_path
+        self.shard = shard
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+        if os.path.dirname(output_path):
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+    def batches(self, size: int = 1) -> Iterator[dict[str, Any]]:
+        # Claimed items, size at a time, until the shard has no work left
+        while True:
+            items = self.manifest.claim(self.owner, self.shard, size)
+            if not items:
+                return
+            yield dict(items)
+
+    def commit(self, item_id: str, result: Any) -> bool:
+        line = json.dumps({"id": item_id, "result": result}) + "\n"
+
+        def write():
+            # A single append of the whole line, under the manifest lock
+            with open(self.output_path, "a") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+        return self.manifest.commit(item_id, self.owner, write)
+
+    def fail(self, item_id: str, error: Exception) -> None:
+        self.manifest.fail(item_id, self.owner, repr(error))
+
+    def release(self, item_ids: Optional[Iterable[str]] = None) -> int:
+        return self.manifest.release(self.owner, item_ids)
+
+    def run(self, process: Callable[[str, Any], Any]) -> int:
+        # Processes the items one by one, a failing item is recorded and retried by a later run.
+        # tqdm is imported here, evaluation reads outputs through this module and starts faster without it
+        from tqdm import tqdm
+
+        done = 0
+        progress = tqdm(total=self.manifest.counts(self.shard).get("pending", 0))
+        # Items claimed by this run and not processed yet
+        claimed = set()
+        try:
+            for batch in self.batches():
+                claimed = set(batch)
+                for item_id, payload in batch.items():
+                    try:
+                        result = process(item_id, payload)
+                    except Exception as e:
+                        self.fail(item_id, e)
+                    else:
+                        done += self.commit(item_id, result)
+                    claimed.discard(item_id)
+                    progress.update(1)
+        finally:
+            # An interrupted run leaves no claims behind, the next run starts where this one stopped
+            self.release(claimed)
+            progress.close()
+        return done
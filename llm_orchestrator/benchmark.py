@@ -0,0 +1,146 @@
+import json
+import os
+import time
+from typing import Optional
+
+from llm_orchestrator.batch_runner import item_id
+from llm_orchestrator.evaluation import Evaluator, score_pair
+from llm_orchestrator.executor import Executor
+from llm_orchestrator.fake_llm import FakeLLMInterface, SyntheticResponder
+from llm_orchestrator.inventory import Inventory
+from llm_orchestrator.planner import Planner
+from llm_orchestrator.schema_renderer import SchemaRenderer
+from llm_orchestrator.telemetry import Telemetry
+from llm_orchestrator.templates import TemplateEngine
+from llm_orchestrator.timing import StageTimer
+from llm_orchestrator.verifier import Verifier
+
+
+def load_intents(test_set_folder: str, scale: int = 1) -> list[tuple[int, str, list[dict]]]:
+    # Pairs each prompt with its ground truth; scale > 1 repeats the test set to build a larger
+    # synthetic intent set, every copy being a distinct intent
+    prompts_folder = os.path.join(test_set_folder, "prompts")
+    ground_truths_folder = os.path.join(test_set_folder, "ground_truths")
+    base = []
+    for name in os.listdir(prompts_folder):
+        question_id = int(item_id(name))
+        with open(os.path.join(prompts_folder, name)) as f:
+            question = f.read()
+        with open(os.path.join(ground_truths_folder, f"answer_{question_id}.json")) as f:
+            ground_truth = json.load(f)
+        base.append((question_id, question, ground_truth))
+    base.sort(key=lambda intent: intent[0])
+    intents = []
+    for copy in range(scale):
+        for question_id, question, ground_truth in base:
+            intents.append((copy * len(base) + question_id, question, ground_truth))
+    return intents
+
+
+def stage_statistics(timer: StageTimer) -> dict:
+    statistics = {}
+    for name, total in timer.totals.items():
+        count = timer.counts[name]
+        statistics[name] = {
+            "count": count,
+            "total": total,
+            "throughput": count / total if total > 0 else float("inf"),
+            "mean": total / count,
+            "p50": timer.percentile(name, 50),
+            "p95": timer.percentile(name, 95),
+            "p99": timer.percentile(name, 99),
+        }
+    return statistics
+
+
+def run_benchmark(
+    test_set_folder: str,
+    schema_dir: str,
+    topology_path: str,
+    system_prompt_folder: str,
+    scale: int = 1,
+    prefill_latency: float = 0.0,
+    decode_latency: float = 0.0,
+    use_templates: bool = False,
+    raw_schemas: bool = False,
+    limit: Optional[int] = None,
+    telemetry: Optional[Telemetry] = None,
+) -> dict:
+    # Drives planning, ID assignment, execution, verification and evaluation end to end with the
+    # fake LLM backend, so the Python-side overhead of every stage can be measured without a model
+    with open(topology_path) as f:
+        topology = json.load(f)
+    responder = SyntheticResponder(topology)
+    intents = load_intents(test_set_folder, scale)[:limit]
+    for intent_id, _, ground_truth in intents:
+        responder.add_intent(intent_id, ground_truth)
+
+    def read_prompt(name: str) -> str:
+        with open(os.path.join(system_prompt_folder, name)) as f:
+            return f.read()
+
+    task_to_schema_path = {
+        "Lightpath": "lightpath_schema.json",
+        "Measurement": "measurement_schema.json",
+        "Service-1Gb": "service_schema.json",
+        "Service-10Gb": "service_schema.json",
+    }
+    renderer = SchemaRenderer()
+    task_to_schema = {}
+    for task, schema in task_to_schema_path.items():
+        with open(os.path.join(schema_dir, schema)) as f:
+            task_to_schema[task] = f.read() if raw_schemas else renderer.render(f.read())
+    # Grammars only matter to the real backend
+    grammars = {task: None for task in task_to_schema}
+
+    verifier = Verifier(schema_dir)
+    inventory = Inventory(topology)
+    planner = Planner(
+        FakeLLMInterface(responder, prefill_latency, decode_latency, telemetry=telemetry, role="planner"),
+        read_prompt("system_prompt_planner.txt"),
+        None,
+        inventory,
+    )
+    executor = Executor(
+        FakeLLMInterface(responder, prefill_latency, decode_latency, telemetry=telemetry, role="executor"),
+        read_prompt("system_prompt_executor.txt"),
+        task_to_schema,
+        grammars,
+        TemplateEngine(verifier) if use_templates else None,
+    )
+
+    timer = StageTimer()
+    if telemetry is not None:
+        telemetry.register_timer("pipeline", timer)
+        telemetry.register_timer("planner", planner.timer)
+        telemetry.register_timer("executor", executor.timer)
+    records = []
+    start = time.perf_counter()
+    for intent_id, question, ground_truth in intents:
+        owner = str(intent_id)
+        pipeline_start = time.perf_counter()
+        with timer.stage("planning"):
+            tasks = planner.plan(f"{question}\n(intent {intent_id})", owner=owner)
+        commands = []
+        for task in tasks:
+            with timer.stage("execution"):
+                commands.append(executor.execute(task))
+        for command in commands:
+            with timer.stage("verification"):
+                verifier.verify(command)
+        with timer.stage("evaluation"):
+            records.append(score_pair(verifier, owner, commands, ground_truth))
+        timer.record("pipeline", time.perf_counter() - pipeline_start)
+        inventory.release_owner(owner)
+    elapsed = time.perf_counter() - start
+
+    summary = Evaluator.summarize(records)
+    return {
+        "intents": len(intents),
+        "elapsed": elapsed,
+        "throughput": len(intents) / elapsed if elapsed > 0 else float("inf"),
+        "stages": stage_statistics(timer),
+        "planner_stages": stage_statistics(planner.timer),
+        "executor_stages": stage_statistics(executor.timer),
+        "command_exact_match_rate": summary["command_exact_match_rate"],
+    }
@@ -0,0 +1,29 @@
+import importlib
+import sys
+from argparse import ArgumentParser
+from typing import Optional
+
+# Subcommands and the modules running them. A module is only imported when its subcommand runs, so
+# that verify and evaluate start without loading llama.cpp or building grammars
+COMMANDS = {
+    "plan": ("llm_orchestrator.commands.plan", "Plan the test set questions into task lists"),
+    "execute": ("llm_orchestrator.commands.execute", "Turn the task lists into JSON commands"),
+    "baseline": ("llm_orchestrator.commands.baseline", "Answer the test set questions with the baseline"),
+    "evaluate": ("llm_orchestrator.commands.evaluate", "Score predictions against the ground truths"),
+    "verify": ("llm_orchestrator.commands.verify", "Check JSON commands against the schemas"),
+    "serve": ("llm_orchestrator.commands.serve", "Serve intents over a socket"),
+    "benchmark": ("llm_orchestrator.commands.benchmark", "Benchmark the pipeline with a fake LLM backend"),
+    "pack": ("llm_orchestrator.commands.pack", "Convert datasets between folders and packed files"),
+}
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = ArgumentParser(prog="llm-orchestrator")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for name, (_, description) in COMMANDS.items():
+        # The arguments of the subcommand, --help included, are parsed by its own module
+        subparsers.add_parser(name, help=description, add_help=False)
+    args, command_argv = parser.parse_known_args(argv)
+    module = importlib.import_module(COMMANDS[args.command][0])
+    sys.argv[0] = f"llm-orchestrator {args.command}"
+    sys.exit(module.main(command_argv))
@@ -0,0 +1,92 @@
+import os
+from argparse import ArgumentParser
+from contextlib import nullcontext
+from typing import Iterator, Optional
+
+from llm_orchestrator.batch_runner import BatchRunner, WorkManifest, parse_shard
+from llm_orchestrator.completion_cache import CompletionCache
+from llm_orchestrator.llm_interface import LLMInterface
+from llm_orchestrator.packed_dataset import read_dataset
+from llm_orchestrator.schema_renderer import SchemaRenderer
+from llm_orchestrator.telemetry import Telemetry
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = ArgumentParser()
+    parser.add_argument("--telemetry_log", default=None, help="Log every LLM call as a JSON line to this file")
+    parser.add_argument("--metrics_path", default=None, help="Write the Prometheus metrics to this file at the end")
+    parser.add_argument("--profile_path", default=None, help="Dump cProfile stats of the baseline to this file")
+    parser.add_argument("--shard", type=parse_shard, default=(0, 1), help="Part i/N of the work to run")
+    parser.add_argument(
+        "--prompts_path",
+        default=os.path.join(".", "data", "test_set", "prompts"),
+        help="Folder of prompt_N.txt files or packed dataset",
+    )
+    parser.add_argument(
+        "--stale_after", type=float, default=3600.0, help="Seconds after which a claim of a crashed run is taken over"
+    )
+    parser.add_argument("--manifest_path", default=os.path.join(".", "data", "cache", "baseline_manifest.sqlite"))
+    parser.add_argument(
+        "--output_path", default=os.path.join(".", "data", "test_set", "predictions_baseline", "predictions.jsonl")
+    )
+    args = parser.parse_args(argv)
+
+    model_path = os.path.join(".", "data", "models", "mixtral-8x7b-instruct-v0.1.Q4_K_M.gguf")
+    system_prompt_path = os.path.join(".", "data", "system_prompts", "system_prompt_baseline.txt")
+    prefix_cache_dir = os.path.join(".", "data", "cache", "prefixes")
+    completion_cache_path = os.path.join(".", "data", "cache", "completions.sqlite")
+    schema_folder = os.path.join(".", "data", "json_schemas")
+
+    # Load LLM to memory
+    completion_cache = CompletionCache(completion_cache_path)
+    telemetry = Telemetry(args.telemetry_log)
+    interface = LLMInterface(
+        model_path,
+        prefix_cache_dir=prefix_cache_dir,
+        completion_cache=completion_cache,
+        telemetry=telemetry,
+        role="baseline",
+        n_ctx=8192,
+    )
+    task_to_schema_path = {
+        "Lightpath": "lightpath_schema.json",
+        "Measurement": "measurement_schema.json",
+        "Service": "service_schema.json",
+    }
+    # Compact renderings of the schemas, they are most of the prompt
+    renderer = SchemaRenderer()
+    task_to_schema = {
+        task: renderer.render_file(os.path.join(schema_folder, schema)) for task, schema in task_to_schema_path.items()
+    }
+    # Concatenate all the json schemas in one string, shared by all the questions
+    context = ""
+    for task, schema in task_to_schema.items():
+        context = context + f"Schema for {task}:" + schema + "\n"
+
+    # Read system prompt and prefill it once, it is shared by all the questions
+    system_prompt = open(system_prompt_path).read()
+    interface.set_prefix("[INST]" + system_prompt)
+
+    # One work item per question, answers are appended to the output as they are done
+    manifest = WorkManifest(args.manifest_path, stale_after=args.stale_after)
+    manifest.add(read_dataset(args.prompts_path))
+    runner = BatchRunner(manifest, args.output_path, shard=args.shard)
+
+    def answer(question_id: str, question: str) -> str:
+        question = "User: " + question
+        # Generate the tokens for the full prompt
+        # Mistral Instruct requires two special tokens to start and end the prompt
+        tokens = interface.tokenize("[INST]" + system_prompt + question + context + "Assistant:\n" "[/INST]")
+        output = interface.generate(tokens, max_tokens=0, seed=42)
+        if not isinstance(output, Iterator):
+            return output["choices"][0]["text"]
+        return next(output)["choices"][0]["text"]
+
+    profile = Telemetry.profile(args.profile_path) if args.profile_path is not None else nullcontext()
+    with profile:
+        runner.run(answer)
+    print(manifest.counts(args.shard))
+    telemetry.close()
+    if args.metrics_path is not None:
+        telemetry.write_prometheus(args.metrics_path)
+
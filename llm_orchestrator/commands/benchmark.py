@@ -0,0 +1,60 @@
+import json
+import os
+from argparse import ArgumentParser
+from contextlib import nullcontext
+from typing import Optional
+
+from llm_orchestrator.benchmark import run_benchmark
+from llm_orchestrator.telemetry import Telemetry
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = ArgumentParser()
+
+    parser.add_argument("--test_set_folder", default=os.path.join(".", "data", "test_set"))
+    parser.add_argument("--schema_dir", default=os.path.join(".", "data", "json_schemas"))
+    parser.add_argument("--topology_path", default=os.path.join(".", "data", "topology.json"))
+    parser.add_argument("--system_prompt_folder", default=os.path.join(".", "data", "system_prompts"))
+    parser.add_argument("--scale", type=int, default=1, help="Number of copies of the test set to run")
+    parser.add_argument("--prefill_latency", type=float, default=0.0, help="Simulated seconds per prompt token")
+    parser.add_argument("--decode_latency", type=float, default=0.0, help="Simulated seconds per output token")
+    parser.add_argument("--templates", action="store_true", help="Let the executor templates bypass the LLM")
+    parser.add_argument("--raw_schemas", action="store_true", help="Put the raw JSON schemas in the executor prompts")
+    parser.add_argument("--report_path", default=None)
+    parser.add_argument("--metrics_path", default=None, help="Write the Prometheus metrics to this file")
+    parser.add_argument("--telemetry_log", default=None, help="Log every LLM call as a JSON line to this file")
+    parser.add_argument("--profile_path", default=None, help="Dump cProfile stats of the run to this file")
+    args = parser.parse_args(argv)
+
+    telemetry = Telemetry(args.telemetry_log)
+    profile = Telemetry.profile(args.profile_path) if args.profile_path is not None else nullcontext()
+    with profile:
+        results = run_benchmark(
+            args.test_set_folder,
+            args.schema_dir,
+            args.topology_path,
+            args.system_prompt_folder,
+            scale=args.scale,
+            prefill_latency=args.prefill_latency,
+            decode_latency=args.decode_latency,
+            use_templates=args.templates,
+            raw_schemas=args.raw_schemas,
+            telemetry=telemetry,
+        )
+    telemetry.close()
+
+    print(f"{results['intents']} intents in {results['elapsed']:.3f}s ({results['throughput']:.1f} intents/s)")
+    print(f"Command exact match rate: {results['command_exact_match_rate']:.3f}")
+    for group in ("stages", "planner_stages", "executor_stages"):
+        print(f"\n{group}")
+        for name, stats in results[group].items():
+            print(
+                f"  {name:<14} n={stats['count']:<6} {stats['throughput']:>10.1f}/s"
+                f"  p50={stats['p50'] * 1000:.3f}ms p95={stats['p95'] * 1000:.3f}ms p99={stats['p99'] * 1000:.3f}ms"
+            )
+    if args.report_path is not None:
+        with open(args.report_path, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.metrics_path is not None:
+        telemetry.write_prometheus(args.metrics_path)
+
@@ -0,0 +1,46 @@
+import json
+import os
+from argparse import ArgumentParser
+from typing import Optional
+
+from llm_orchestrator.evaluation import Evaluator, pair_files, pair_results
+
+
+def main(argv: Optional[list[str]] = None, baseline: bool = False):
+    parser = ArgumentParser()
+
+    ground_truth_path_default = os.path.join(".", "data", "test_set", "ground_truths")
+    schema_dir_default = os.path.join(".", "data", "json_schemas")
+
+    parser.add_argument(
+        "--baseline", action="store_true", default=baseline, help="Evaluate the raw answers of the baseline"
+    )
+    parser.add_argument("--predictions_path", default=None)
+    parser.add_argument("--predictions_folder", default=None, help="Read one prediction file per pair instead")
+    parser.add_argument(
+        "--ground_truth_path", default=ground_truth_path_default, help="Folder of answer_N.json files or packed dataset"
+    )
+    parser.add_argument("--schema_dir", default=schema_dir_default)
+    parser.add_argument("--report_path", default=None)
+    parser.add_argument("--n_workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    # The baseline answers are LLM text, the JSON data has to be parsed out of it
+    predictions_folder = os.path.join(".", "data", "test_set", "predictions_baseline" if args.baseline else "predictions")
+    predictions_path = args.predictions_path or os.path.join(
+        predictions_folder, "predictions.jsonl" if args.baseline else "json_data.jsonl"
+    )
+    report_path = args.report_path or os.path.join(predictions_folder, "report.jsonl")
+
+    # Score all the prediction/ground truth pairs in a process pool
+    evaluator = Evaluator(args.schema_dir, n_workers=args.n_workers)
+    if args.predictions_folder is not None:
+        extension = ".txt" if args.baseline else ".json"
+        pairs = pair_files(args.predictions_folder, args.ground_truth_path, extension=extension)
+    else:
+        pairs = pair_results(predictions_path, args.ground_truth_path)
+    records = evaluator.evaluate(pairs, parse_llm_output=args.baseline)
+    summary = evaluator.summarize(records)
+    evaluator.write_report(records, summary, report_path)
+
+    print(json.dumps(summary, indent=2))
@@ -0,0 +1,127 @@
+import json
+import os
+from argparse import ArgumentParser
+from contextlib import nullcontext
+from typing import Optional
+
+from llm_orchestrator.batch_runner import BatchRunner, WorkManifest, parse_shard
+from llm_orchestrator.completion_cache import CompletionCache
+from llm_orchestrator.executor import BatchExecutor, Executor
+from llm_orchestrator.grammar_cache import GrammarCache
+from llm_orchestrator.jump_forward import JumpForwardDecoder
+from llm_orchestrator.llm_interface import LLMInterface
+from llm_orchestrator.packed_dataset import read_dataset
+from llm_orchestrator.schema_renderer import SchemaRenderer
+from llm_orchestrator.telemetry import Telemetry
+from llm_orchestrator.templates import TemplateEngine
+from llm_orchestrator.verifier import Verifier
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = ArgumentParser()
+    parser.add_argument("--n_workers", type=int, default=1)
+    parser.add_argument("--disable_templates", action="store_true")
+    parser.add_argument("--jump_forward", action="store_true", help="Append the text forced by the schema unsampled")
+    parser.add_argument("--raw_schemas", action="store_true", help="Put the raw JSON schemas in the prompts")
+    parser.add_argument("--telemetry_log", default=None, help="Log every LLM call as a JSON line to this file")
+    parser.add_argument("--metrics_path", default=None, help="Write the Prometheus metrics to this file at the end")
+    parser.add_argument("--profile_path", default=None, help="Dump cProfile stats of the execution to this file")
+    parser.add_argument("--shard", type=parse_shard, default=(0, 1), help="Part i/N of the work to run")
+    parser.add_argument("--batch_size", type=int, default=16, help="Task lists claimed at a time")
+    parser.add_argument(
+        "--stale_after", type=float, default=3600.0, help="Seconds after which a claim of a crashed run is taken over"
+    )
+    parser.add_argument("--manifest_path", default=os.path.join(".", "data", "cache", "execution_manifest.sqlite"))
+    parser.add_argument(
+        "--task_lists_path", default=os.path.join(".", "data", "test_set", "predictions", "task_lists.jsonl")
+    )
+    parser.add_argument(
+        "--output_path", default=os.path.join(".", "data", "test_set", "predictions", "json_data.jsonl")
+    )
+    args = parser.parse_args(argv)
+
+    model_path = os.path.join(".", "data", "models", "mistral-7b-instruct-v0.2.Q5_K_M.gguf")
+    system_prompt_path = os.path.join(".", "data", "system_prompts", "system_prompt_executor.txt")
+    prefix_cache_dir = os.path.join(".", "data", "cache", "prefixes")
+    completion_cache_path = os.path.join(".", "data", "cache", "completions.sqlite")
+    grammar_cache_dir = os.path.join(".", "data", "cache", "grammars")
+    schema_folder = os.path.join(".", "data", "json_schemas")
+
+    task_to_schema_path = {
+        "Lightpath": "lightpath_schema.json",
+        "Measurement": "measurement_schema.json",
+        "Service-1Gb": "service_schema.json",
+        "Service-10Gb": "service_schema.json",
+    }
+    raw_schemas = {
+        task: open(os.path.join(schema_folder, schema)).read() for task, schema in task_to_schema_path.items()
+    }
+    # Create dictionary of grammars, task types sharing a schema share the same grammar
+    grammar_cache = GrammarCache(grammar_cache_dir)
+    grammars_dict = {}
+    for task, schema in raw_schemas.items():
+        grammars_dict[task] = grammar_cache.from_json_schema(schema)
+    # The grammar enforces the full schema, the prompt only gets its compact rendering
+    renderer = SchemaRenderer()
+    task_to_schema = raw_schemas if args.raw_schemas else {task: renderer.render(s) for task, s in raw_schemas.items()}
+
+    # Read system prompt
+    system_prompt = open(system_prompt_path).read()
+    # Tasks fully resolved by the templates skip the LLM
+    templates = None if args.disable_templates else TemplateEngine(Verifier(schema_folder))
+
+    # One work item per task list produced by the planning
+    manifest = WorkManifest(args.manifest_path, stale_after=args.stale_after)
+    manifest.add(read_dataset(args.task_lists_path))
+    runner = BatchRunner(manifest, args.output_path, shard=args.shard)
+
+    # Load one LLM to memory per worker. The model file is memory-mapped, so the weights are shared,
+    # and the CPU threads are split among the workers
+    n_threads = max(1, (os.cpu_count() or 1) // 2 // args.n_workers)
+    completion_cache = CompletionCache(completion_cache_path)
+    telemetry = Telemetry(args.telemetry_log)
+    executors = []
+    for _ in range(args.n_workers):
+        interface = LLMInterface(
+            model_path,
+            prefix_cache_dir=prefix_cache_dir,
+            completion_cache=completion_cache,
+            telemetry=telemetry,
+            role="executor",
+            n_ctx=8192,
+            n_threads=n_threads,
+        )
+        decoders = None
+        if args.jump_forward:
+            decoders = {
+                task: JumpForwardDecoder(interface, json.loads(schema), grammar_cache)
+                for task, schema in raw_schemas.items()
+            }
+        executors.append(Executor(interface, system_prompt, task_to_schema, grammars_dict, templates, decoders))
+        telemetry.register_timer(f"executor_{len(executors) - 1}", executors[-1].timer)
+
+    if not args.raw_schemas:
+        for task, schema in raw_schemas.items():
+            raw_tokens, rendered_tokens = renderer.token_counts(schema, executors[0].interface.tokenize)
+            print(f"Schema for {task}: {raw_tokens} prompt tokens rendered in {rendered_tokens}")
+
+    # Task lists are claimed batch_size at a time, and each one is committed to the output as soon
+    # as all its tasks are done
+    profile = Telemetry.profile(args.profile_path) if args.profile_path is not None else nullcontext()
+    with profile:
+        try:
+            for task_lists in runner.batches(args.batch_size):
+                BatchExecutor(executors).run(task_lists, on_complete=runner.commit, on_error=runner.fail)
+        finally:
+            # Task lists of an interrupted batch go back to the queue
+            runner.release()
+    print(manifest.counts(args.shard))
+    if args.jump_forward:
+        decoders = [decoder for executor in executors for decoder in executor.decoders.values()]
+        forced = sum(decoder.forced_characters for decoder in decoders)
+        sampled = sum(decoder.sampled_characters for decoder in decoders)
+        print(f"Jump-forward decoding: {forced} characters forced, {sampled} sampled")
+    telemetry.close()
+    if args.metrics_path is not None:
+        telemetry.write_prometheus(args.metrics_path)
+
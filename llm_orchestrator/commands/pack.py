@@ -0,0 +1,26 @@
+from argparse import ArgumentParser
+from typing import Optional
+
+from llm_orchestrator.packed_dataset import pack_folder, unpack
+
+
+def main(argv: Optional[list[str]] = None):
+    # Converts between the one file per record layout and packed datasets, e.g.
+    # llm-orchestrator pack pack ./data/test_set/ground_truths ./data/test_set/ground_truths.jsonl
+    # llm-orchestrator pack unpack ./data/test_set/predictions/json_data.jsonl ./data/test_set/predictions/json_data
+    parser = ArgumentParser()
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    pack_parser = subparsers.add_parser("pack", help="Pack a folder of files named like answer_N.json")
+    pack_parser.add_argument("folder")
+    pack_parser.add_argument("path")
+    unpack_parser = subparsers.add_parser("unpack", help="Write every record of a packed dataset to its own file")
+    unpack_parser.add_argument("path")
+    unpack_parser.add_argument("folder")
+    unpack_parser.add_argument("--name_format", default="prediction_{}.json")
+    args = parser.parse_args(argv)
+
+    if args.command == "pack":
+        print(f"Packed {pack_folder(args.folder, args.path)} records into {args.path}")
+    else:
+        print(f"Unpacked {unpack(args.path, args.folder, args.name_format)} records into {args.folder}")
+
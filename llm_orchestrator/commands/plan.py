@@ -0,0 +1,93 @@
+import json
+import os
+from argparse import ArgumentParser
+from contextlib import nullcontext
+from typing import Optional
+
+from llm_orchestrator.batch_runner import BatchRunner, WorkManifest, parse_shard
+from llm_orchestrator.completion_cache import CompletionCache
+from llm_orchestrator.grammar_cache import GrammarCache
+from llm_orchestrator.inventory import Inventory
+from llm_orchestrator.llm_interface import LLMInterface
+from llm_orchestrator.packed_dataset import read_dataset
+from llm_orchestrator.planner import Planner
+from llm_orchestrator.telemetry import Telemetry
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = ArgumentParser()
+    parser.add_argument("--telemetry_log", default=None, help="Log every LLM call as a JSON line to this file")
+    parser.add_argument("--metrics_path", default=None, help="Write the Prometheus metrics to this file at the end")
+    parser.add_argument("--profile_path", default=None, help="Dump cProfile stats of the planning to this file")
+    parser.add_argument("--shard", type=parse_shard, default=(0, 1), help="Part i/N of the work to run")
+    parser.add_argument(
+        "--prompts_path",
+        default=os.path.join(".", "data", "test_set", "prompts"),
+        help="Folder of prompt_N.txt files or packed dataset",
+    )
+    parser.add_argument(
+        "--stale_after", type=float, default=3600.0, help="Seconds after which a claim of a crashed run is taken over"
+    )
+    parser.add_argument("--manifest_path", default=os.path.join(".", "data", "cache", "planning_manifest.sqlite"))
+    parser.add_argument(
+        "--output_path", default=os.path.join(".", "data", "test_set", "predictions", "task_lists.jsonl")
+    )
+    args = parser.parse_args(argv)
+
+    model_path = os.path.join(".", "data", "models", "mixtral-8x7b-instruct-v0.1.Q4_K_M.gguf")
+    system_prompt_path = os.path.join(".", "data", "system_prompts", "system_prompt_planner.txt")
+    prefix_cache_dir = os.path.join(".", "data", "cache", "prefixes")
+    completion_cache_path = os.path.join(".", "data", "cache", "completions.sqlite")
+    grammar_cache_dir = os.path.join(".", "data", "cache", "grammars")
+    schema_path = os.path.join(".", "data", "json_schemas", "task_schema.json")
+    topology_path = os.path.join(".", "data", "topology.json")
+
+    # One work item per question. The manifest is shared by all the processes running the planning,
+    # each of them claims questions of its shard and appends the task lists to the output
+    manifest = WorkManifest(args.manifest_path, stale_after=args.stale_after)
+    manifest.add(read_dataset(args.prompts_path))
+    runner = BatchRunner(manifest, args.output_path, shard=args.shard)
+
+    # Interface IDs are allocated from the topology inventory. Each question is planned against
+    # the initial network, so its allocations are released once the task list is done
+    inventory = Inventory.from_file(topology_path)
+
+    # Load LLM to memory
+    completion_cache = CompletionCache(completion_cache_path)
+    telemetry = Telemetry(args.telemetry_log)
+    interface = LLMInterface(
+        model_path,
+        prefix_cache_dir=prefix_cache_dir,
+        completion_cache=completion_cache,
+        telemetry=telemetry,
+        role="planner",
+        n_ctx=8192,
+    )
+
+    # Create grammar
+    grammar = GrammarCache(grammar_cache_dir).from_schema_file(schema_path)
+
+    # Read system prompt
+    system_prompt = open(system_prompt_path).read()
+    planner = Planner(interface, system_prompt, grammar, inventory)
+    telemetry.register_timer("planner", planner.timer)
+
+    def plan(question_id: str, question: str) -> list[dict]:
+        try:
+            return planner.plan(question, owner=question_id)
+        except json.JSONDecodeError as e:
+            print(f"Error parsing the task list for question {question_id}")
+            print(e.doc)
+            raise e
+        finally:
+            inventory.release_owner(question_id)
+
+    profile = Telemetry.profile(args.profile_path) if args.profile_path is not None else nullcontext()
+    with profile:
+        runner.run(plan)
+    print(manifest.counts(args.shard))
+    print(planner.timer.summary())
+    telemetry.close()
+    if args.metrics_path is not None:
+        telemetry.write_prometheus(args.metrics_path)
+
@@ -0,0 +1,115 @@
+import asyncio
+import os
+from argparse import ArgumentParser
+from typing import Optional
+
+from llm_orchestrator.completion_cache import CompletionCache
+from llm_orchestrator.executor import Executor
+from llm_orchestrator.grammar_cache import GrammarCache
+from llm_orchestrator.inventory import Inventory
+from llm_orchestrator.model_manager import ModelManager
+from llm_orchestrator.planner import Planner
+from llm_orchestrator.schema_renderer import SchemaRenderer
+from llm_orchestrator.service import Orchestrator, OrchestratorServer
+from llm_orchestrator.telemetry import Telemetry
+from llm_orchestrator.templates import TemplateEngine
+from llm_orchestrator.verifier import Verifier
+
+
+async def serve(args, orchestrator: Orchestrator):
+    server = OrchestratorServer(orchestrator, n_workers=args.n_workers, max_queue_size=args.max_queue_size)
+    listener = await server.start(host=args.host, port=args.port, unix_socket=args.unix_socket)
+    print("Orchestrator listening on", args.unix_socket or f"{args.host}:{args.port}")
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        await server.stop()
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix_socket", default=None)
+    parser.add_argument("--n_workers", type=int, default=2)
+    parser.add_argument("--max_queue_size", type=int, default=64)
+    parser.add_argument("--metrics_port", type=int, default=None, help="Serve Prometheus metrics at /metrics")
+    parser.add_argument("--telemetry_log", default=None, help="Log every LLM call as a JSON line to this file")
+    parser.add_argument("--ram_budget", type=float, default=None, help="GB of RAM the loaded models may take")
+    parser.add_argument("--planner_n_ctx", type=int, default=8192)
+    parser.add_argument("--executor_n_ctx", type=int, default=8192)
+    parser.add_argument("--planner_n_threads", type=int, default=None)
+    parser.add_argument("--executor_n_threads", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    planner_model_path = os.path.join(".", "data", "models", "mixtral-8x7b-instruct-v0.1.Q4_K_M.gguf")
+    executor_model_path = os.path.join(".", "data", "models", "mistral-7b-instruct-v0.2.Q5_K_M.gguf")
+    system_prompt_folder = os.path.join(".", "data", "system_prompts")
+    prefix_cache_dir = os.path.join(".", "data", "cache", "prefixes")
+    completion_cache_path = os.path.join(".", "data", "cache", "completions.sqlite")
+    grammar_cache_dir = os.path.join(".", "data", "cache", "grammars")
+    schema_folder = os.path.join(".", "data", "json_schemas")
+    topology_path = os.path.join(".", "data", "topology.json")
+    allocations_path = os.path.join(".", "data", "cache", "allocations.jsonl")
+
+    task_to_schema_path = {
+        "Lightpath": "lightpath_schema.json",
+        "Measurement": "measurement_schema.json",
+        "Service-1Gb": "service_schema.json",
+        "Service-10Gb": "service_schema.json",
+    }
+    raw_schemas = {
+        task: open(os.path.join(schema_folder, schema)).read() for task, schema in task_to_schema_path.items()
+    }
+    grammar_cache = GrammarCache(grammar_cache_dir)
+    grammars_dict = {task: grammar_cache.from_json_schema(schema) for task, schema in raw_schemas.items()}
+    # The grammar enforces the full schema, the prompt only gets its compact rendering
+    renderer = SchemaRenderer()
+    task_to_schema = {task: renderer.render(schema) for task, schema in raw_schemas.items()}
+
+    verifier = Verifier(schema_folder)
+    # Allocations are persisted, interface IDs stay in use across requests and restarts
+    inventory = Inventory.from_file(topology_path, state_path=allocations_path)
+
+    # Both LLMs are shared by all the requests. They are loaded on first use, and when they do not
+    # fit in the RAM budget together the idle one is unloaded (its prefix state is reloaded from disk)
+    completion_cache = CompletionCache(completion_cache_path)
+    telemetry = Telemetry(args.telemetry_log)
+    models = ModelManager(
+        ram_budget=int(args.ram_budget * 2**30) if args.ram_budget is not None else None,
+        prefix_cache_dir=prefix_cache_dir,
+        completion_cache=completion_cache,
+        telemetry=telemetry,
+    )
+    planner = Planner(
+        models.register(
+            "planner", planner_model_path, n_ctx=args.planner_n_ctx, n_threads=args.planner_n_threads
+        ),
+        open(os.path.join(system_prompt_folder, "system_prompt_planner.txt")).read(),
+        grammar_cache.from_schema_file(os.path.join(schema_folder, "task_schema.json")),
+        inventory,
+    )
+    executor = Executor(
+        models.register(
+            "executor", executor_model_path, n_ctx=args.executor_n_ctx, n_threads=args.executor_n_threads
+        ),
+        open(os.path.join(system_prompt_folder, "system_prompt_executor.txt")).read(),
+        task_to_schema,
+        grammars_dict,
+        TemplateEngine(verifier),
+    )
+    orchestrator = Orchestrator(planner, executor, verifier, inventory)
+    telemetry.register_timer("planner", planner.timer)
+    telemetry.register_timer("executor", executor.timer)
+    if args.metrics_port is not None:
+        telemetry.serve_metrics(args.host, args.metrics_port)
+    try:
+        asyncio.run(serve(args, orchestrator))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        orchestrator.close()
+        models.close()
+        telemetry.close()
+
@@ -0,0 +1,43 @@
+import json
+import os
+import sys
+from argparse import ArgumentParser
+from typing import Optional
+
+from llm_orchestrator.verifier import Verifier
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    # Checks JSON commands against the schemas. Exits with 1 if any command is invalid, so that it
+    # can be used from hooks and scripts
+    parser = ArgumentParser()
+    parser.add_argument("paths", nargs="*", default=["-"], help="JSON files with a command or a list of commands")
+    parser.add_argument("--schema_dir", default=os.path.join(".", "data", "json_schemas"))
+    parser.add_argument("--quiet", action="store_true", help="Only report invalid commands")
+    args = parser.parse_args(argv)
+
+    verifier = Verifier(args.schema_dir)
+    n_invalid = 0
+    for path in args.paths:
+        name = "<stdin>" if path == "-" else path
+        try:
+            if path == "-":
+                data = json.load(sys.stdin)
+            else:
+                with open(path) as f:
+                    data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"{name}: {e}")
+            n_invalid += 1
+            continue
+        commands = data if isinstance(data, list) else [data]
+        for index, command in enumerate(commands):
+            valid, errors = verifier.verify(command)
+            label = name if not isinstance(data, list) else f"{name}[{index}]"
+            if not valid:
+                n_invalid += 1
+                for error in errors:
+                    print(f"{label}: {error}")
+            elif not args.quiet:
+                print(f"{label}: valid")
+    return 1 if n_invalid else 0
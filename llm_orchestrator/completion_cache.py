@@ -0,0 +1,90 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+
+class CompletionCache:
+    # Content-addressed store of completions, kept in SQLite and bounded in size with LRU eviction.
+    # Only deterministic calls (fixed seed, fixed grammar) should be looked up here
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024, journal_mode: str = "DELETE"):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        # The rollback journal works on the network file systems the pipeline scripts may share the
+        # cache over. WAL only works on local disks, where it lets readers run during a write. The mode
+        # is set explicitly since it persists in the file
+        if journal_mode.upper() not in ("DELETE", "TRUNCATE", "PERSIST", "WAL"):
+            raise ValueError(f"Unsupported journal mode {journal_mode!r}")
+        self._connection.execute(f"PRAGMA journal_mode={journal_mode}")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS completions "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS completions_last_used ON completions (last_used)")
+        self._connection.commit()
+        self._total_bytes = self._stored_bytes()
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        key = hashlib.sha256()
+        for part in parts:
+            key.update(json.dumps(part, sort_keys=True, default=str).encode("utf-8"))
+            key.update(b"\0")
+        return key.hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self._connection.execute("SELECT value FROM completions WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._connection.execute("UPDATE completions SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._connection.commit()
+        return json.loads(row[0])
+
+    def put(self, key: str, value: Any) -> None:
+        data = json.dumps(value)
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO completions (key, value, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, data, len(data), time.time()),
+            )
+            self._total_bytes += len(data)
+            self._evict()
+            self._connection.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM completions").fetchone()[0]
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def _stored_bytes(self) -> int:
+        return self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM completions").fetchone()[0]
+
+    def _evict(self) -> None:
+        # The running total counts replaced entries twice, so the exact size is only computed
+        # once it crosses the limit
+        if self._total_bytes <= self.max_bytes:
+            return
+        total = self._stored_bytes()
+        rows = self._connection.execute("SELECT key, size FROM completions ORDER BY last_used ASC")
+        evicted = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        self._connection.executemany("DELETE FROM completions WHERE key = ?", evicted)
+        self._total_bytes = total
@@ -0,0 +1,222 @@
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Iterable, Optional
+
+from llm_orchestrator.batch_runner import item_id
+from llm_orchestrator.packed_dataset import PackedDataset
+from llm_orchestrator.structural_diff import structural_diff
+from llm_orchestrator.verifier import Verifier
+
+# One verifier per worker process, built once by the pool initializer
+_verifier: Optional[Verifier] = None
+
+
+def _init_worker(schema_dir: str) -> None:
+    global _verifier
+    _verifier = Verifier(schema_dir)
+
+
+def load_prediction(source: Any, parse_llm_output: bool = False) -> Any:
+    # source is a prediction file, or {"result": ...} for a prediction read from a JSONL output
+    if isinstance(source, dict):
+        prediction = source["result"]
+        if not parse_llm_output:
+            return prediction
+        prediction = _verifier._parse_llm_output(prediction)
+    else:
+        with open(source) as f:
+            if not parse_llm_output:
+                return json.load(f)
+            prediction = _verifier._parse_llm_output(f.read())
+    # The baseline may answer with a single object instead of a list
+    return prediction if isinstance(prediction, list) else [prediction]
+
+
+def task_type(command: dict) -> Optional[str]:
+    # Task type of the planner the command answers, e.g. "Service-10Gb". Both service rates share a schema
+    if "pm" in command or "transports" in command:
+        return "Measurement"
+    if command.get("hierarchicalLevel") == "infrastructure":
+        return "Lightpath"
+    if command.get("hierarchicalLevel") == "service":
+        conn_lps = command.get("connLps") or [{}]
+        rate = conn_lps[0].get("rate") if isinstance(conn_lps[0], dict) else None
+        return f"Service-{rate}" if rate is not None else "Service"
+    return None
+
+
+def compare_command(verifier: Verifier, prediction: Any, ground_truth: dict) -> dict:
+    valid, _ = verifier.verify(prediction)
+    schema_name = verifier.schema_name(ground_truth)
+    schema = verifier.schema(schema_name) if schema_name is not None else None
+    # A key missing on one side is fine if the other side holds the schema default
+    differences = structural_diff(prediction, ground_truth, schema)
+    fields = {}
+    if isinstance(prediction, dict):
+        wrong_fields = {difference["field"] for difference in differences}
+        for key in sorted(set(prediction) | set(ground_truth)):
+            fields[key] = key not in wrong_fields
+    return {
+        "task_type": task_type(ground_truth) or schema_name,
+        "valid": valid,
+        "exact_match": prediction == ground_truth,
+        "fields": fields,
+        "differences": differences,
+    }
+
+
+def evaluate_pair(item: tuple[str, Any, str, bool]) -> dict:
+    pair_id, prediction_source, ground_truth_source, parse_llm_output = item
+    ground_truth = load_prediction(ground_truth_source)
+    record = {
+        "id": pair_id,
+        "ground_truth_count": len(ground_truth),
+        "prediction_count": 0,
+        "missing": prediction_source is None,
+        "parse_error": False,
+        "length_match": False,
+        "valid": False,
+        "exact_match": False,
+        "commands": [],
+    }
+    if prediction_source is None:
+        return record
+    try:
+        prediction = load_prediction(prediction_source, parse_llm_output)
+    except json.JSONDecodeError:
+        record["parse_error"] = True
+        return record
+    return score_pair(_verifier, pair_id, prediction, ground_truth)
+
+
+def score_pair(verifier: Verifier, pair_id: str, prediction: list, ground_truth: list[dict]) -> dict:
+    commands = [
+        dict(index=index, **compare_command(verifier, command, truth))
+        for index, (command, truth) in enumerate(zip(prediction, ground_truth))
+    ]
+    length_match = len(prediction) == len(ground_truth)
+    return {
+        "id": pair_id,
+        "ground_truth_count": len(ground_truth),
+        "prediction_count": len(prediction),
+        "missing": False,
+        "parse_error": False,
+        "length_match": length_match,
+        "valid": length_match and all(command["valid"] for command in commands),
+        "exact_match": prediction == ground_truth,
+        "commands": commands,
+    }
+
+
+class Evaluator:
+    def __init__(self, schema_dir: str, n_workers: Optional[int] = None):
+        self.schema_dir = schema_dir
+        self.n_workers = n_workers
+
+    def evaluate(self, pairs: Iterable[tuple[str, Any, str]], parse_llm_output: bool = False) -> list[dict]:
+        items = [(pair_id, prediction, truth, parse_llm_output) for pair_id, prediction, truth in pairs]
+        if self.n_workers == 1:
+            _init_worker(self.schema_dir)
+            return [evaluate_pair(item) for item in items]
+        n_workers = self.n_workers or os.cpu_count() or 1
+        # Large chunks keep the inter-process overhead low for thousands of small pairs
+        chunksize = max(1, len(items) // (4 * n_workers))
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker, initargs=(self.schema_dir,)) as pool:
+            return list(pool.map(evaluate_pair, items, chunksize=chunksize))
+
+    @staticmethod
+    def summarize(records: list[dict]) -> dict:
+        commands = [command for record in records for command in record["commands"]]
+        field_results: dict[str, list[bool]] = {}
+        task_results: dict[str, dict[str, list[bool]]] = {}
+        difference_paths: dict[str, int] = {}
+        for command in commands:
+            for difference in command["differences"]:
+                difference_paths[difference["path"]] = difference_paths.get(difference["path"], 0) + 1
+            for key, correct in command["fields"].items():
+                field_results.setdefault(key, []).append(correct)
+            results = task_results.setdefault(command["task_type"] or "unknown", {"valid": [], "exact_match": []})
+            results["valid"].append(command["valid"])
+            results["exact_match"].append(command["exact_match"])
+
+        def rate(values: list[bool]) -> float:
+            return sum(values) / len(values) if values else 0.0
+
+        return {
+            "pairs": len(records),
+            "commands": len(commands),
+            "exact_match_rate": rate([record["exact_match"] for record in records]),
+            "valid_rate": rate([record["valid"] for record in records]),
+            "length_match_rate": rate([record["length_match"] for record in records]),
+            "missing": sum(record["missing"] for record in records),
+            "parse_errors": sum(record["parse_error"] for record in records),
+            "command_exact_match_rate": rate([command["exact_match"] for command in commands]),
+            "field_accuracy": {key: rate(values) for key, values in sorted(field_results.items())},
+            # Number of commands differing from the ground truth at each JSON path
+            "difference_paths": dict(sorted(difference_paths.items())),
+            "task_types": {
+                task_type: {
+                    "commands": len(results["valid"]),
+                    "valid_rate": rate(results["valid"]),
+                    "exact_match_rate": rate(results["exact_match"]),
+                }
+                for task_type, results in sorted(task_results.items())
+            },
+        }
+
+    @staticmethod
+    def write_report(records: list[dict], summary: dict, report_path: str) -> None:
+        # <report>.jsonl holds one record per prediction/ground truth pair, next to it
+        # <report>_summary.json holds the aggregated metrics and <report>_commands.csv one row per command
+        stem = os.path.splitext(report_path)[0]
+        os.makedirs(os.path.dirname(report_path) or ".", exist_ok=True)
+        with open(report_path, "w") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+        with open(f"{stem}_summary.json", "w") as f:
+            json.dump(summary, f, indent=2)
+
+        field_names = sorted({key for record in records for command in record["commands"] for key in command["fields"]})
+        with open(f"{stem}_commands.csv", "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["id", "index", "task_type", "valid", "exact_match"] + field_names)
+            for record in records:
+                for command in record["commands"]:
+                    fields = command["fields"]
+                    writer.writerow(
+                        [record["id"], command["index"], command["task_type"], command["valid"], command["exact_match"]]
+                        + [fields.get(key, "") for key in field_names]
+                    )
+
+
+def pair_files(predictions_folder: str, ground_truth_path: str, extension: str = ".json") -> list[tuple]:
+    # Pairs prediction_N with answer_N by ID, a missing prediction is reported as such
+    predictions = {}
+    for name in os.listdir(predictions_folder):
+        if name.endswith(extension) and item_id(name) is not None:
+            predictions[item_id(name)] = os.path.join(predictions_folder, name)
+    return _pair_ground_truths(predictions, ground_truth_path)
+
+
+def pair_results(results_path: str, ground_truth_path: str) -> list[tuple]:
+    # Pairs the results of a batch runner JSONL output (a packed dataset) with the ground truths by ID
+    predictions = {pair_id: {"result": result} for pair_id, result in PackedDataset(results_path)}
+    return _pair_ground_truths(predictions, ground_truth_path)
+
+
+def _pair_ground_truths(predictions: dict[str, Any], ground_truth_path: str) -> list[tuple]:
+    # The ground truths are a folder of answer_N.json files or a packed dataset
+    pairs = []
+    if os.path.isdir(ground_truth_path):
+        for name in os.listdir(ground_truth_path):
+            pair_id = item_id(name)
+            if pair_id is not None:
+                pairs.append((pair_id, predictions.get(pair_id), os.path.join(ground_truth_path, name)))
+    else:
+        for pair_id, ground_truth in PackedDataset(ground_truth_path):
+            pairs.append((pair_id, predictions.get(pair_id), {"result": ground_truth}))
+    # Numeric IDs in numeric order, then the other IDs of a packed dataset
+    pairs.sort(key=lambda pair: (not pair[0].isdigit(), int(pair[0]) if pair[0].isdigit() else pair[0]))
+    return pairs
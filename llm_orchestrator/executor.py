@@ -0,0 +1,129 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from queue import Empty, Queue
+from typing import Any, Callable, Optional
+
+from tqdm import tqdm
+
+from llm_orchestrator.jump_forward import JumpForwardDecoder
+from llm_orchestrator.templates import TemplateEngine
+from llm_orchestrator.timing import StageTimer
+
+
+class Executor:
+    def __init__(
+        self,
+        interface,
+        system_prompt: str,
+        task_to_schema: dict[str, str],
+        grammars: dict[str, Any],
+        templates: Optional[TemplateEngine] = None,
+        decoders: Optional[dict[str, JumpForwardDecoder]] = None,
+    ):
+        self.interface = interface
+        self.system_prompt = system_prompt
+        self.task_to_schema = task_to_schema
+        self.grammars = grammars
+        self.templates = templates
+        # Jump-forward decoders per task type, used instead of sampling the whole output with the grammar
+        self.decoders = decoders
+        self.timer = StageTimer()
+        # The system prompt is shared by all the tasks, prefill it once
+        self.interface.set_prefix("[INST]" + system_prompt)
+
+    def execute(self, task: dict) -> dict:
+        # The LLM is only called for tasks the templates cannot fully resolve
+        if self.templates is not None:
+            with self.timer.stage("template"):
+                command = self.templates.build(task)
+            if command is not None:
+                return command
+        schema_name = task["task"]
+        # Mistral/Mixtral Instruct requires two special tokens to start and end the prompt
+        prompt = self.system_prompt + task["description"] + "\n" + self.task_to_schema[schema_name]
+        prompt = "[INST]" + prompt + "[/INST]"
+        if self.decoders is not None:
+            # The decoder tokenizes the prompt itself, together with the output decoded so far
+            with self.timer.stage("generate"):
+                text = self.decoders[schema_name].decode(prompt, seed=42)
+        else:
+            # Generate the tokens for the full prompt
+            with self.timer.stage("tokenize"):
+                tokens = self.interface.tokenize(prompt)
+            with self.timer.stage("generate"):
+                output = self.interface.generate(tokens, max_tokens=0, seed=42, grammar=self.grammars[schema_name])
+            text = output["choices"][0]["text"]
+        with self.timer.stage("parse"):
+            return json.loads(text)
+
+
+class BatchExecutor:
+    def __init__(self, executors: list[Executor]):
+        # One executor per worker, each with its own LLMInterface since llama.cpp contexts
+        # cannot be shared between threads. The GIL is released while decoding
+        self.executors = executors
+
+    def run(
+        self,
+        task_lists: dict[str, list[dict]],
+        on_complete: Optional[Callable[[str, list[dict]], None]] = None,
+        on_error: Optional[Callable[[str, Exception], None]] = None,
+    ) -> dict[str, list[dict]]:
+        # A task failing fails its task list: on_error is called once for it, its remaining tasks are
+        # skipped and the other task lists go on. Without on_error, the exception is raised
+        # Gather the tasks of all the task lists, grouped by task type so that each worker
+        # keeps sampling with the same grammar for as long as possible
+        pending = [(key, index, task) for key, tasks in task_lists.items() for index, task in enumerate(tasks)]
+        pending.sort(key=lambda item: item[2]["task"])
+        queue: Queue = Queue()
+        for item in pending:
+            queue.put(item)
+
+        results = {key: [None] * len(tasks) for key, tasks in task_lists.items()}
+        remaining = {key: len(tasks) for key, tasks in task_lists.items()}
+        failed = set()
+        lock = threading.Lock()
+        progress = tqdm(total=len(pending))
+
+        if on_complete is not None:
+            for key, count in remaining.items():
+                if count == 0:
+                    on_complete(key, results[key])
+
+        def worker(executor: Executor):
+            while True:
+                try:
+                    key, index, task = queue.get_nowait()
+                except Empty:
+                    return
+                if key in failed:
+                    progress.update(1)
+                    continue
+                try:
+                    command = executor.execute(task)
+                except Exception as e:
+                    if on_error is None:
+                        raise
+                    with lock:
+                        first_error = key not in failed
+                        failed.add(key)
+                        progress.update(1)
+                    if first_error:
+                        on_error(key, e)
+                    continue
+                with lock:
+                    results[key][index] = command
+                    remaining[key] -= 1
+                    done = remaining[key] == 0
+                    progress.update(1)
+                # Results are handed back in the original task order as soon as a task list is complete
+                if done and on_complete is not None:
+                    on_complete(key, results[key])
+
+        with ThreadPoolExecutor(max_workers=len(self.executors)) as pool:
+            futures = [pool.submit(worker, executor) for executor in self.executors]
+            for future in futures:
+                future.result()
+        progress.close()
+        return results
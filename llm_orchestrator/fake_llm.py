@@ -0,0 +1,147 @@
+import hashlib
+import json
+import re
+import time
+from typing import Callable, Iterator, Optional
+
+from llm_orchestrator.llm_interface import AbstractLLMInterface, LLMInterface
+from llm_orchestrator.telemetry import Telemetry
+from llm_orchestrator.templates import IDS_PATTERN
+
+INTENT_PATTERN = re.compile(r"\(intent (\d+)\)")
+COMMAND_PATTERN = re.compile(r"\(command (\d+)\.(\d+)\)")
+
+
+class FakeLLMInterface(AbstractLLMInterface):
+    # Deterministic stand-in for LLMInterface: completions come from a responder (recorded or
+    # synthetic) and the inference cost is simulated with a fixed latency per token
+    def __init__(
+        self,
+        responder: Callable[[str], str],
+        prefill_latency: float = 0.0,
+        decode_latency: float = 0.0,
+        chars_per_token: int = 4,
+        telemetry: Optional[Telemetry] = None,
+        role: str = "fake",
+    ):
+        self.responder = responder
+        self.prefill_latency = prefill_latency
+        self.decode_latency = decode_latency
+        self.chars_per_token = chars_per_token
+        self.telemetry = telemetry
+        self.role = role
+        # Prompt and generation arguments of every call
+        self.calls: list[dict] = []
+        self._cached_tokens: list[str] = []
+
+    def tokenize(self, prompt: str) -> list[str]:
+        # Fixed-size character chunks keep the token count realistic while the prompt stays recoverable
+        return [prompt[i : i + self.chars_per_token] for i in range(0, len(prompt), self.chars_per_token)]
+
+    def set_prefix(self, prefix: str) -> list[str]:
+        tokens = self.tokenize(prefix)
+        self._prefill(tokens)
+        return tokens
+
+    def generate(self, tokens: list[str], stream: bool = False, **kwargs):
+        self.calls.append(dict(kwargs, prompt="".join(tokens)))
+        output = self._stream(tokens)
+        if self.telemetry is not None:
+            reused = LLMInterface._common_prefix_length(self._cached_tokens, tokens)
+            grammar = kwargs.get("grammar") is not None
+            output = self.telemetry.track_stream(self.role, output, len(tokens), reused, grammar, "off")
+        return output if stream else LLMInterface._join_stream(output)
+
+    def _stream(self, tokens: list[str]) -> Iterator[dict]:
+        # Like llama.cpp, the prompt is only evaluated once the first token is requested
+        self._prefill(tokens)
+        for piece in self.tokenize(self.responder("".join(tokens))):
+            if self.decode_latency:
+                time.sleep(self.decode_latency)
+            yield {"choices": [{"text": piece, "index": 0, "finish_reason": None}]}
+
+    def _prefill(self, tokens: list[str]) -> None:
+        # Only the tokens after the prefix shared with the previous prompt are evaluated
+        n_cached = LLMInterface._common_prefix_length(self._cached_tokens, tokens)
+        if self.prefill_latency:
+            time.sleep(self.prefill_latency * (len(tokens) - n_cached))
+        self._cached_tokens = list(tokens)
+
+
+class ReplayResponder:
+    # Serves completions recorded as JSON lines {"prompt": ..., "completion": ...}
+    def __init__(self, recording_path: str):
+        self._completions = {}
+        with open(recording_path) as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    self._completions[self._key(record["prompt"])] = record["completion"]
+
+    def __call__(self, prompt: str) -> str:
+        return self._completions[self._key(prompt)]
+
+    @staticmethod
+    def _key(prompt: str) -> str:
+        return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+class SyntheticResponder:
+    # Answers planner and executor prompts of synthetic intents built from ground truths.
+    # Questions carry an "(intent k)" marker and task descriptions a "(command k.i)" marker
+    def __init__(self, topology: dict[str, dict[str, list[int]]]):
+        self._node_of = {
+            interface_id: node
+            for node, service_types in topology.items()
+            for interface_ids in service_types.values()
+            for interface_id in interface_ids
+        }
+        self._ground_truths: dict[int, list[dict]] = {}
+
+    def add_intent(self, intent_id: int, ground_truth: list[dict]) -> None:
+        self._ground_truths[intent_id] = ground_truth
+
+    def __call__(self, prompt: str) -> str:
+        match = COMMAND_PATTERN.search(prompt)
+        if match is not None:
+            return json.dumps(self.command(int(match.group(1)), int(match.group(2)), prompt))
+        match = INTENT_PATTERN.search(prompt)
+        if match is not None:
+            return json.dumps(self.task_list(int(match.group(1))))
+        raise KeyError("Prompt does not belong to a synthetic intent")
+
+    def task_list(self, intent_id: int) -> list[dict]:
+        tasks = []
+        for index, command in enumerate(self._ground_truths[intent_id]):
+            marker = f"(command {intent_id}.{index})"
+            if "connEndPoints" not in command:
+                periods = [name for key, name in (("cd15m", "15-minute"), ("cd24h", "24-hour")) if key in command["pm"]]
+                description = (
+                    f"Launch a measurement campaign on '{command['transports']['name']}'. "
+                    f"Requirements: enable {' and '.join(periods)} measurements. {marker}"
+                )
+                tasks.append({"task": "Measurement", "description": description, "source": "", "sink": ""})
+                continue
+            source, sink = (self._node_of[end["ltp"]["id"]] for end in command["connEndPoints"])
+            if command["hierarchicalLevel"] == "infrastructure":
+                task_type, kind = "Lightpath", "lightpath"
+            else:
+                task_type, kind = f"Service-{command['connLps'][0]['rate']}", "service"
+            requirements = [
+                f"name is '{command['name']}'",
+                "protected" if command["protection"] else "unprotected",
+                f"configuration state is {command['configurationState']}",
+            ]
+            if command["routingCriteria"] == "byHops":
+                requirements.append("routing by hops")
+            description = f"Create a {kind} from {source} to {sink}. Requirements: {', '.join(requirements)}. {marker}"
+            tasks.append({"task": task_type, "description": description, "source": source, "sink": sink})
+        return tasks
+
+    def command(self, intent_id: int, index: int, prompt: Optional[str] = None) -> dict:
+        command = json.loads(json.dumps(self._ground_truths[intent_id][index]))
+        match = IDS_PATTERN.search(prompt or "")
+        if match is not None and "connEndPoints" in command:
+            for end, interface_id in zip(command["connEndPoints"], match.groups()):
+                end["ltp"]["id"] = int(interface_id)
+        return command
@@ -0,0 +1,63 @@
+import hashlib
+import os
+from importlib import metadata
+from typing import Any, Optional
+
+
+class GrammarCache:
+    def __init__(self, cache_dir: Optional[str] = None):
+        self._cache_dir = cache_dir
+        self._grammars: dict[str, Any] = {}
+        # The generated GBNF depends on the converter, so the llama.cpp version is part of the key
+        try:
+            self._version = metadata.version("llama_cpp_python")
+        except metadata.PackageNotFoundError:
+            self._version = "unknown"
+
+    def from_schema_file(self, schema_path: str):
+        with open(schema_path) as f:
+            return self.from_json_schema(f.read())
+
+    def from_json_schema(self, schema: str):
+        # Schemas with the same content (e.g. Service-1Gb and Service-10Gb) share one grammar object
+        key = self._key(schema)
+        grammar = self._grammars.get(key)
+        if grammar is None:
+            from llama_cpp.llama_grammar import LlamaGrammar
+
+            grammar = LlamaGrammar.from_string(self.gbnf(schema), verbose=False)
+            self._grammars[key] = grammar
+        return grammar
+
+    def from_gbnf(self, gbnf: str):
+        # Grammars written directly in GBNF, shared like the ones built from schemas
+        key = self._key("gbnf\n" + gbnf)
+        grammar = self._grammars.get(key)
+        if grammar is None:
+            from llama_cpp.llama_grammar import LlamaGrammar
+
+            grammar = LlamaGrammar.from_string(gbnf, verbose=False)
+            self._grammars[key] = grammar
+        return grammar
+
+    def gbnf(self, schema: str) -> str:
+        key = self._key(schema)
+        path = os.path.join(self._cache_dir, f"{key}.gbnf") if self._cache_dir is not None else None
+        if path is not None and os.path.exists(path):
+            with open(path) as f:
+                return f.read()
+
+        from llama_cpp.llama_grammar import json_schema_to_gbnf
+
+        gbnf = json_schema_to_gbnf(schema)
+        if path is not None:
+            os.makedirs(self._cache_dir, exist_ok=True)
+            # Write to a temporary file first so concurrent runs never read a partial grammar
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                f.write(gbnf)
+            os.replace(tmp_path, path)
+        return gbnf
+
+    def _key(self, schema: str) -> str:
+        return hashlib.sha256(f"{self._version}\n{schema}".encode("utf-8")).hexdigest()
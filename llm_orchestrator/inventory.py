@@ -0,0 +1,109 @@
+import json
+import os
+import threading
+from typing import Optional
+
+
+class Inventory:
+    # Interface IDs per (node, service type), with O(1) allocate/release. Allocations can be
+    # persisted to an append-only journal so that they survive across requests and restarts
+    def __init__(self, topology: dict[str, dict[str, list[int]]], state_path: Optional[str] = None):
+        self._lock = threading.Lock()
+        # Free IDs are kept in insertion-ordered dicts used as ordered sets: popitem() hands out
+        # the last entry, so they are stored in reverse to hand IDs out in topology order
+        self._free: dict[tuple[str, str], dict[int, None]] = {}
+        self._location: dict[int, tuple[str, str]] = {}
+        self._owner: dict[int, str] = {}
+        self._owned: dict[str, set[int]] = {}
+        for node, service_types in topology.items():
+            for service_type, interface_ids in service_types.items():
+                self._free[(node, service_type)] = dict.fromkeys(reversed(interface_ids))
+                for interface_id in interface_ids:
+                    self._location[interface_id] = (node, service_type)
+        self._state_path = state_path
+        self._journal = None
+        if state_path is not None:
+            self._load_state()
+
+    @classmethod
+    def from_file(cls, topology_path: str, state_path: Optional[str] = None) -> "Inventory":
+        with open(topology_path) as f:
+            return cls(json.load(f), state_path)
+
+    def allocate(self, node: str, service_type: str, owner: str = "") -> int:
+        with self._lock:
+            free = self._free[(node, service_type)]
+            if not free:
+                raise LookupError(f"No free {service_type} interface left on {node}")
+            interface_id, _ = free.popitem()
+            self._mark_allocated(interface_id, owner)
+            self._write({"op": "allocate", "id": interface_id, "owner": owner})
+        return interface_id
+
+    def release(self, interface_id: int) -> None:
+        with self._lock:
+            self._release(interface_id)
+            self._write({"op": "release", "id": interface_id})
+
+    def release_owner(self, owner: str) -> list[int]:
+        with self._lock:
+            interface_ids = sorted(self._owned.get(owner, ()))
+            for interface_id in interface_ids:
+                self._release(interface_id)
+                self._write({"op": "release", "id": interface_id})
+        return interface_ids
+
+    def is_allocated(self, interface_id: int) -> bool:
+        return interface_id in self._owner
+
+    def owner(self, interface_id: int) -> Optional[str]:
+        return self._owner.get(interface_id)
+
+    def free_count(self, node: str, service_type: str) -> int:
+        return len(self._free[(node, service_type)])
+
+    def close(self) -> None:
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def _mark_allocated(self, interface_id: int, owner: str) -> None:
+        self._owner[interface_id] = owner
+        self._owned.setdefault(owner, set()).add(interface_id)
+
+    def _release(self, interface_id: int) -> None:
+        owner = self._owner.pop(interface_id, None)
+        if owner is None:
+            return
+        self._owned[owner].discard(interface_id)
+        if not self._owned[owner]:
+            del self._owned[owner]
+        self._free[self._location[interface_id]][interface_id] = None
+
+    def _write(self, event: dict) -> None:
+        if self._journal is not None:
+            self._journal.write(json.dumps(event) + "\n")
+            self._journal.flush()
+
+    def _load_state(self) -> None:
+        # Replay the journal, then compact it to the current allocations only
+        if os.path.exists(self._state_path):
+            with open(self._state_path) as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    event = json.loads(line)
+                    interface_id = event["id"]
+                    if event["op"] == "allocate" and interface_id in self._location and interface_id not in self._owner:
+                        del self._free[self._location[interface_id]][interface_id]
+                        self._mark_allocated(interface_id, event["owner"])
+                    elif event["op"] == "release":
+                        self._release(interface_id)
+        if os.path.dirname(self._state_path):
+            os.makedirs(os.path.dirname(self._state_path), exist_ok=True)
+        tmp_path = f"{self._state_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            for interface_id, owner in self._owner.items():
+                f.write(json.dumps({"op": "allocate", "id": interface_id, "owner": owner}) + "\n")
+        os.replace(tmp_path, self._state_path)
+        self._journal = open(self._state_path, "a")
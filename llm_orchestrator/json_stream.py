@@ -0,0 +1,75 @@
+import json
+from typing import Any
+
+
+class JSONArrayStreamParser:
+    # Incremental parser for a top-level JSON array: text is fed as it is decoded, and every
+    # element is returned as soon as it is complete, before the rest of the array is generated
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._element_start = None
+        self._started = False
+        self.finished = False
+
+    def feed(self, text: str) -> list[Any]:
+        self._buffer += text
+        elements = []
+        buffer = self._buffer
+        pos = self._pos
+        while pos < len(buffer) and not self.finished:
+            char = buffer[pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif not self._started:
+                if char == "[":
+                    self._started = True
+                    self._depth = 1
+                elif not char.isspace():
+                    raise json.JSONDecodeError("Expected a JSON array", buffer, pos)
+            elif char in "{[":
+                if self._depth == 1 and self._element_start is None:
+                    self._element_start = pos
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 1:
+                    elements.append(self._complete(pos + 1))
+                elif self._depth == 0:
+                    # End of the array, possibly right after a number/literal element
+                    if self._element_start is not None:
+                        elements.append(self._complete(pos))
+                    self.finished = True
+            elif char == ",":
+                if self._depth == 1 and self._element_start is not None:
+                    elements.append(self._complete(pos))
+            elif not char.isspace() and self._depth == 1 and self._element_start is None:
+                self._element_start = pos
+                self._in_string = char == '"'
+            elif char == '"':
+                self._in_string = True
+            pos += 1
+        # Drop the text of the elements already returned
+        cut = self._element_start if self._element_start is not None else pos
+        self._buffer = buffer[cut:]
+        self._pos = pos - cut
+        if self._element_start is not None:
+            self._element_start = 0
+        return elements
+
+    def close(self) -> None:
+        if not self.finished:
+            raise json.JSONDecodeError("Incomplete JSON array", self._buffer, len(self._buffer))
+
+    def _complete(self, end: int) -> Any:
+        element = json.loads(self._buffer[self._element_start : end])
+        self._element_start = None
+        return element
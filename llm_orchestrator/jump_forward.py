@@ -0,0 +1,167 @@
+import json
+import os
+import re
+from typing import Any
+
+from llm_orchestrator.grammar_cache import GrammarCache
+from llm_orchestrator.llm_interface import AbstractLLMInterface
+
+STRING_GBNF = r"""root ::= "\"" char* "\""
+char ::= [^"\\\x7F\x00-\x1F] | [\\] (["\\/bfnrt] | "u" [0-9a-fA-F] [0-9a-fA-F] [0-9a-fA-F] [0-9a-fA-F])"""
+
+# A number ends at the first character that cannot be part of it, so the grammar makes the model close it
+# with a delimiter, which is then dropped: the delimiter that follows is decided by the schema
+INTEGER_GBNF = r"""root ::= "-"? ([0-9] | [1-9] [0-9]{1,15}) [,}\]]"""
+NUMBER_GBNF = r"""root ::= "-"? ([0-9] | [1-9] [0-9]{1,15}) ("." [0-9]{1,16})? ([eE] [-+]? [0-9]{1,15})? [,}\]]"""
+NUMBER_PATTERN = re.compile(r"-?\d+(\.\d+)?([eE][-+]?\d+)?")
+
+# Keywords that the walker does not handle, subschemas using them are sampled in full with their grammar
+UNSUPPORTED_KEYWORDS = ("$ref", "anyOf", "oneOf", "allOf", "pattern", "format", "minLength", "maxLength")
+
+
+class JumpForwardDecoder:
+    # Decodes a JSON document following a schema, laid out like the grammar llama.cpp builds from it
+    # (required properties first, then the optional ones in order). Text with a single legal
+    # continuation, i.e. keys, punctuation and single-value enums, is appended without sampling and
+    # evaluated in one batch with the next prompt. The model is only sampled where it has a choice
+    # (enum values, optional keys, array lengths, free values) with a small grammar for that span
+    def __init__(
+        self,
+        interface: AbstractLLMInterface,
+        schema: dict,
+        grammar_cache: GrammarCache,
+        max_string_tokens: int = 128,
+    ):
+        self.interface = interface
+        self.schema = schema
+        self.grammar_cache = grammar_cache
+        self.max_string_tokens = max_string_tokens
+        self.forced_characters = 0
+        self.sampled_characters = 0
+        self.samples = 0
+        self._prompt = ""
+        self._parts: list[str] = []
+        self._kwargs: dict = {}
+
+    def decode(self, prompt: str, **kwargs) -> str:
+        # kwargs are passed to every generate call (e.g. seed), the span limits are set here
+        self._prompt = prompt
+        self._parts = []
+        self._kwargs = {name: value for name, value in kwargs.items() if name not in ("max_tokens", "grammar")}
+        self._value(self.schema)
+        return "".join(self._parts)
+
+    def _value(self, schema: dict) -> None:
+        values = schema.get("enum")
+        if values is None and "const" in schema:
+            values = [schema["const"]]
+        schema_type = schema.get("type")
+        if any(keyword in schema for keyword in UNSUPPORTED_KEYWORDS):
+            self._sample_schema(schema)
+        elif values is not None:
+            self._choose([json.dumps(value) for value in values])
+        elif "properties" in schema and not schema.get("additionalProperties"):
+            self._object(schema)
+        elif schema_type == "array" and isinstance(schema.get("items"), dict) and "properties" in schema["items"]:
+            self._array(schema)
+        elif schema_type == "boolean":
+            self._choose(["true", "false"])
+        elif schema_type == "string":
+            text = self._sample(self.grammar_cache.from_gbnf(STRING_GBNF), self.max_string_tokens)
+            _, end = json.JSONDecoder().raw_decode(text)
+            self._append(text[:end], sampled=True)
+        elif schema_type in ("integer", "number"):
+            gbnf = INTEGER_GBNF if schema_type == "integer" else NUMBER_GBNF
+            text = self._sample(self.grammar_cache.from_gbnf(gbnf), 24)
+            match = NUMBER_PATTERN.match(text)
+            if match is None:
+                raise ValueError(f"Expected a number, got {text!r}")
+            self._append(match.group(0), sampled=True)
+        else:
+            self._sample_schema(schema)
+
+    def _object(self, schema: dict, opened: bool = False) -> None:
+        if not opened:
+            self._append("{")
+        properties = schema["properties"]
+        required = set(schema.get("required", ()))
+        first = True
+        for key in (key for key in properties if key in required):
+            self._append(("" if first else ", ") + json.dumps(key) + ": ")
+            first = False
+            self._value(properties[key])
+        # Any in-order subset of the optional properties may follow
+        remaining = [key for key in properties if key not in required]
+        while remaining:
+            separator = "" if first else ", "
+            choice = self._choose([separator + json.dumps(key) + ": " for key in remaining] + ["}"])
+            if choice == len(remaining):
+                return
+            self._value(properties[remaining[choice]])
+            remaining = remaining[choice + 1 :]
+            first = False
+        self._append("}")
+
+    def _array(self, schema: dict) -> None:
+        self._append("[")
+        min_items = schema.get("minItems", 0)
+        max_items = schema.get("maxItems")
+        n_items = 0
+        while True:
+            item_start = "{" if n_items == 0 else ", {"
+            if n_items < min_items:
+                self._append(item_start)
+            elif max_items is not None and n_items >= max_items:
+                break
+            elif self._choose([item_start, "]"]) == 1:
+                return
+            self._object(schema["items"], opened=True)
+            n_items += 1
+        self._append("]")
+
+    def _choose(self, alternatives: list[str]) -> int:
+        # The model is sampled one token at a time, under a grammar allowing just the remaining
+        # alternatives, until only one is left. Prefixes shared by all of them and the rest of the
+        # chosen alternative are appended without sampling
+        candidates = list(range(len(alternatives)))
+        chosen = ""
+        while True:
+            candidates = [i for i in candidates if alternatives[i].startswith(chosen)]
+            remainders = [alternatives[i][len(chosen) :] for i in candidates]
+            common = os.path.commonprefix(remainders)
+            if len(candidates) == 1 or common:
+                self._append(common if len(candidates) > 1 else remainders[0])
+                if len(candidates) == 1:
+                    return candidates[0]
+                chosen += common
+                continue
+            gbnf = "root ::= " + " | ".join(json.dumps(remainder) for remainder in remainders)
+            text = self._sample(self.grammar_cache.from_gbnf(gbnf), 1)
+            if not text and "" in remainders:
+                # End of generation, when an alternative is a prefix of another one (e.g. 1 and 10)
+                return candidates[remainders.index("")]
+            if not text or not any(remainder.startswith(text) for remainder in remainders):
+                raise ValueError(f"Expected one of {remainders}, got {text!r}")
+            self._append(text, sampled=True)
+            chosen += text
+
+    def _sample_schema(self, schema: dict) -> None:
+        # Fallback to plain grammar-constrained sampling of the whole value
+        text = self._sample(self.grammar_cache.from_json_schema(json.dumps(schema)), 0)
+        _, end = json.JSONDecoder().raw_decode(text)
+        self._append(text[:end], sampled=True)
+
+    def _sample(self, grammar: Any, max_tokens: int) -> str:
+        # The whole prompt is tokenized again: llama.cpp reuses the tokens it already has in the KV
+        # cache, so only the text appended since the last call is evaluated, in a single batch
+        tokens = self.interface.tokenize(self._prompt + "".join(self._parts))
+        output = self.interface.generate(tokens, max_tokens=max_tokens, grammar=grammar, **self._kwargs)
+        self.samples += 1
+        return output["choices"][0]["text"]
+
+    def _append(self, text: str, sampled: bool = False) -> None:
+        self._parts.append(text)
+        if sampled:
+            self.sampled_characters += len(text)
+        else:
+            self.forced_characters += len(text)
@@ -1,7 +1,14 @@
+import hashlib
+import os
+import pickle
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import TYPE_CHECKING, Any, Iterator, Optional
 
-from llama_cpp import Llama
+from llm_orchestrator.completion_cache import CompletionCache
+from llm_orchestrator.telemetry import Telemetry
+
+if TYPE_CHECKING:
+    from llama_cpp import LlamaState
 
 
 class AbstractLLMInterface(ABC):
@@ -9,14 +16,178 @@ class AbstractLLMInterface(ABC):
     def generate(self, tokens: Any, **kwargs) -> Any:
         pass
 
+    @abstractmethod
+    def tokenize(self, prompt: str) -> Any:
+        pass
+
+    def set_prefix(self, prefix: str) -> Any:
+        return self.tokenize(prefix)
+
+    def stream(self, tokens: Any, **kwargs) -> Iterator[str]:
+        # Yield the completion text piece by piece as it is decoded
+        for chunk in self.generate(tokens, stream=True, **kwargs):
+            yield chunk["choices"][0]["text"]
+
 
 class LLMInterface(AbstractLLMInterface):
-    def __init__(self, model_path: str, **kwargs):
+    def __init__(
+        self,
+        model_path: str,
+        prefix_cache_dir: Optional[str] = None,
+        completion_cache: Optional[CompletionCache] = None,
+        telemetry: Optional[Telemetry] = None,
+        role: Optional[str] = None,
+        **kwargs,
+    ):
+        # llama.cpp is imported here so that other backends (e.g. the fake one used for
+        # benchmarks) can be used without loading the native library
+        from llama_cpp import Llama
+
         self.llm = Llama(model_path=model_path, n_gpu_layers=-1, **kwargs)
         self.llm.verbose = False
+        self._model_path = model_path
+        self._model_key = [os.path.basename(model_path), os.path.getsize(model_path)]
+        self._prefix_cache_dir = prefix_cache_dir
+        self._completion_cache = completion_cache
+        # Calls are recorded in telemetry under role (e.g. "planner"), by default the model file name
+        self.telemetry = telemetry
+        self.role = role or os.path.basename(model_path)
+        self._prefix_tokens: list[int] = []
+        self._prefix_state: Optional["LlamaState"] = None
+
+    def set_prefix(self, prefix: str) -> list[int]:
+        # Evaluate a prompt prefix shared by all subsequent calls (e.g. the system prompt) once.
+        # The state after the prefix is kept in memory and, if prefix_cache_dir is set, persisted
+        # to disk keyed by model and prefix hash, so later runs skip the prefill entirely
+        tokens = self.tokenize(prefix)
+        state = self._load_prefix_state(tokens)
+        if self.telemetry is not None and self._prefix_cache_dir is not None:
+            self.telemetry.record_prefix_lookup(self.role, state is not None)
+        if state is None:
+            self.llm.reset()
+            self.llm.eval(tokens)
+            state = self.llm.save_state()
+            self._save_prefix_state(tokens, state)
+        self._prefix_tokens = tokens
+        self._prefix_state = state
+        return tokens
 
     def generate(self, tokens: list[int], **kwargs):
-        return self.llm.create_completion(tokens, **kwargs)
+        stream = kwargs.get("stream", False)
+        key = self._completion_key(tokens, kwargs)
+        if key is not None:
+            completion = self._completion_cache.get(key)
+            if completion is not None:
+                if self.telemetry is not None:
+                    self.telemetry.record_call(
+                        self.role, len(tokens), len(tokens), 0, 0.0, 0.0, kwargs.get("grammar") is not None, "hit"
+                    )
+                # A cached completion is replayed as a single chunk to streaming callers
+                return iter([completion]) if stream else completion
+        self._restore_prefix(tokens)
+        if self.telemetry is None:
+            output = self.llm.create_completion(tokens, **kwargs)
+        else:
+            # Always decode as a stream when instrumented, so that prefill and decode can be timed apart
+            output = self.telemetry.track_stream(
+                self.role,
+                self.llm.create_completion(tokens, **{**kwargs, "stream": True}),
+                len(tokens),
+                self._common_prefix_length(self.llm._input_ids, tokens),
+                kwargs.get("grammar") is not None,
+                "off" if key is None else "miss",
+            )
+            if not stream:
+                output = self._join_stream(output)
+        if key is None:
+            return output
+        if stream:
+            return self._cache_stream(key, output)
+        self._completion_cache.put(key, output)
+        return output
 
     def tokenize(self, prompt: str):
         return self.llm.tokenize(prompt.encode("utf-8"))
+
+    def close(self) -> None:
+        # Frees the model and its KV cache, the interface cannot be used afterwards
+        self._prefix_state = None
+        self.llm.close()
+
+    def _restore_prefix(self, tokens: list[int]) -> None:
+        # llama.cpp already reuses the longest common prefix with the tokens currently in the
+        # KV cache, so the saved state only has to be loaded when the cache has diverged from it
+        if self._prefix_state is None:
+            return
+        n_prefix = self._common_prefix_length(self._prefix_tokens, tokens)
+        if n_prefix == 0:
+            return
+        if self._common_prefix_length(self.llm._input_ids, tokens) >= n_prefix:
+            return
+        self.llm.load_state(self._prefix_state)
+
+    def _completion_key(self, tokens: list[int], kwargs: dict) -> Optional[str]:
+        # Only calls with a fixed seed are deterministic, and a grammar is only part of the key
+        # if its GBNF text is available
+        if self._completion_cache is None or "seed" not in kwargs:
+            return None
+        grammar = kwargs.get("grammar")
+        grammar_text = getattr(grammar, "_grammar", None) if grammar is not None else ""
+        if grammar_text is None:
+            return None
+        params = {name: value for name, value in kwargs.items() if name not in ("grammar", "stream")}
+        return CompletionCache.make_key(self._model_key, list(tokens), grammar_text, params)
+
+    def _cache_stream(self, key: str, output: Iterator[dict]) -> Iterator[dict]:
+        chunks = []
+        for chunk in output:
+            chunks.append(chunk)
+            yield chunk
+        self._completion_cache.put(key, self._join_stream(chunks))
+
+    @staticmethod
+    def _join_stream(chunks) -> dict:
+        texts = []
+        finish_reason = None
+        for chunk in chunks:
+            texts.append(chunk["choices"][0]["text"])
+            finish_reason = chunk["choices"][0].get("finish_reason")
+        return {"choices": [{"text": "".join(texts), "index": 0, "finish_reason": finish_reason}]}
+
+    def _prefix_state_path(self, tokens: list[int]) -> str:
+        key = hashlib.sha256()
+        key.update(str(self._model_key).encode("utf-8"))
+        key.update(str(self.llm.n_ctx()).encode("utf-8"))
+        key.update(",".join(map(str, tokens)).encode("utf-8"))
+        return os.path.join(self._prefix_cache_dir, f"prefix_{key.hexdigest()}.pkl")
+
+    def _load_prefix_state(self, tokens: list[int]) -> Optional["LlamaState"]:
+        if self._prefix_cache_dir is None:
+            return None
+        path = self._prefix_state_path(tokens)
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+        self.llm.load_state(state)
+        return state
+
+    def _save_prefix_state(self, tokens: list[int], state: "LlamaState") -> None:
+        if self._prefix_cache_dir is None:
+            return
+        os.makedirs(self._prefix_cache_dir, exist_ok=True)
+        path = self._prefix_state_path(tokens)
+        # Write to a temporary file first so concurrent runs never read a partial state
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(state, f)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _common_prefix_length(a, b) -> int:
+        n = 0
+        for x, y in zip(a, b):
+            if x != y:
+                break
+            n += 1
+        return n
@@ -0,0 +1,188 @@
+import os
+import threading
+import warnings
+from collections import OrderedDict
+from typing import Any, Callable, Iterator, Optional
+
+from llm_orchestrator.llm_interface import AbstractLLMInterface, LLMInterface
+
+# KV cache size per context token of Mistral-7B and Mixtral-8x7B in f16: 32 layers, 8 KV heads of 128 dimensions
+MISTRAL_KV_BYTES_PER_TOKEN = 32 * 8 * 128 * 2 * 2
+
+
+def load_llama(model_path: str, role: str, **kwargs) -> LLMInterface:
+    # The weights are memory-mapped, so loading is cheap and the pages are shared between processes
+    return LLMInterface(model_path, role=role, use_mmap=True, **kwargs)
+
+
+class ModelManager:
+    # Models registered by role (e.g. "planner", "executor"), each with its own settings such as
+    # n_ctx and n_threads. A model is only loaded on first use, and the least recently used idle
+    # models are unloaded to keep the loaded ones within ram_budget bytes
+    def __init__(
+        self,
+        ram_budget: Optional[int] = None,
+        factory: Callable[..., AbstractLLMInterface] = load_llama,
+        **shared_kwargs,
+    ):
+        self.ram_budget = ram_budget
+        self.factory = factory
+        self.shared_kwargs = shared_kwargs
+        self._specs: dict[str, dict] = {}
+        self._loaded: OrderedDict[str, AbstractLLMInterface] = OrderedDict()
+        # Roles being loaded, their memory is already counted against the budget
+        self._loading: set[str] = set()
+        self._prefixes: dict[str, str] = {}
+        # Threads using each model, a model in use is never unloaded
+        self._users: dict[str, list[int]] = {}
+        self._condition = threading.Condition()
+
+    def register(
+        self,
+        role: str,
+        model_path: str,
+        memory: Optional[int] = None,
+        kv_bytes_per_token: int = MISTRAL_KV_BYTES_PER_TOKEN,
+        **kwargs,
+    ) -> "ManagedInterface":
+        # memory is the RAM the model takes once loaded, by default the size of the file plus the KV cache
+        if memory is None:
+            memory = os.path.getsize(model_path) + kwargs.get("n_ctx", 512) * kv_bytes_per_token
+        self._specs[role] = {"model_path": model_path, "memory": memory, "kwargs": kwargs}
+        return ManagedInterface(self, role)
+
+    def interface(self, role: str) -> "ManagedInterface":
+        return ManagedInterface(self, role)
+
+    def is_loaded(self, role: str) -> bool:
+        return role in self._loaded
+
+    def loaded_memory(self) -> int:
+        return sum(self._specs[role]["memory"] for role in [*self._loaded, *self._loading])
+
+    def acquire(self, role: str) -> AbstractLLMInterface:
+        # Loads the model if needed and marks it in use by the calling thread until release()
+        thread = threading.get_ident()
+        with self._condition:
+            while role not in self._loaded:
+                if role not in self._loading and self._make_room(self._specs[role]["memory"], thread):
+                    self._loading.add(role)
+                    break
+                # Wait for another thread to load or release a model
+                self._condition.wait()
+            else:
+                return self._use(role, thread)
+        # The model is loaded and its prefix evaluated without the lock, so that the other models
+        # can still be used meanwhile
+        try:
+            interface = self._load(role)
+        except BaseException:
+            with self._condition:
+                self._loading.discard(role)
+                self._condition.notify_all()
+            raise
+        with self._condition:
+            self._loading.discard(role)
+            self._loaded[role] = interface
+            self._condition.notify_all()
+            return self._use(role, thread)
+
+    def release(self, role: str) -> None:
+        with self._condition:
+            self._users[role].remove(threading.get_ident())
+            self._condition.notify_all()
+
+    def set_prefix(self, role: str, prefix: str) -> None:
+        # The prefix is evaluated now if the model is loaded, and again each time it is reloaded
+        self._prefixes[role] = prefix
+        with self._condition:
+            loaded = role in self._loaded or role in self._loading
+        if loaded:
+            interface = self.acquire(role)
+            try:
+                interface.set_prefix(prefix)
+            finally:
+                self.release(role)
+
+    def unload(self, role: str) -> None:
+        with self._condition:
+            if role in self._loaded and not self._users.get(role):
+                self._unload(role)
+
+    def close(self) -> None:
+        with self._condition:
+            for role in list(self._loaded):
+                self._unload(role)
+
+    def _make_room(self, memory: int, thread: int) -> bool:
+        # Unloads idle models, least recently used first, until memory fits in the budget. Returns
+        # False if the caller must wait for models used by other threads
+        if self.ram_budget is None:
+            return True
+        for role in list(self._loaded):
+            if self.loaded_memory() + memory <= self.ram_budget:
+                return True
+            if not self._users.get(role):
+                self._unload(role)
+        if self.loaded_memory() + memory <= self.ram_budget:
+            return True
+        if not self._loading and all(user == thread for users in self._users.values() for user in users):
+            # Waiting for our own models would never end
+            warnings.warn(f"Loading the models over the RAM budget of {self.ram_budget} bytes")
+            return True
+        return False
+
+    def _use(self, role: str, thread: int) -> AbstractLLMInterface:
+        self._loaded.move_to_end(role)
+        self._users.setdefault(role, []).append(thread)
+        return self._loaded[role]
+
+    def _load(self, role: str) -> AbstractLLMInterface:
+        spec = self._specs[role]
+        interface = self.factory(spec["model_path"], role, **self.shared_kwargs, **spec["kwargs"])
+        if role in self._prefixes:
+            interface.set_prefix(self._prefixes[role])
+        return interface
+
+    def _unload(self, role: str) -> None:
+        interface = self._loaded.pop(role)
+        close = getattr(interface, "close", None)
+        if close is not None:
+            close()
+
+
+class ManagedInterface(AbstractLLMInterface):
+    # Stands for the model of a role, loading it on demand. It can be given to the Planner and the
+    # Executor in place of an LLMInterface
+    def __init__(self, manager: ModelManager, role: str):
+        self.manager = manager
+        self.role = role
+
+    def set_prefix(self, prefix: str) -> None:
+        self.manager.set_prefix(self.role, prefix)
+
+    def tokenize(self, prompt: str) -> Any:
+        interface = self.manager.acquire(self.role)
+        try:
+            return interface.tokenize(prompt)
+        finally:
+            self.manager.release(self.role)
+
+    def generate(self, tokens: Any, **kwargs) -> Any:
+        interface = self.manager.acquire(self.role)
+        try:
+            output = interface.generate(tokens, **kwargs)
+        except BaseException:
+            self.manager.release(self.role)
+            raise
+        if kwargs.get("stream"):
+            # The model stays in use until the stream is consumed
+            return self._release_after(output)
+        self.manager.release(self.role)
+        return output
+
+    def _release_after(self, output: Iterator[dict]) -> Iterator[dict]:
+        try:
+            yield from output
+        finally:
+            self.manager.release(self.role)
@@ -0,0 +1,178 @@
+import json
+import mmap
+import os
+import zlib
+from typing import Any, Iterable, Iterator, Optional
+
+from llm_orchestrator.batch_runner import item_id
+
+
+class PackedDataset:
+    # A dataset in a single file: records {"id": ..., "result": ...} appended one per line, which is
+    # also the format of the batch runner outputs. The offset of every record is kept in an index
+    # next to it (path + ".idx", one "id offset length crc32" line per record), extended as the file
+    # grows. The last indexed record is checked against the file, so an index left over from a file
+    # that was deleted and written again is rebuilt.
+    # Records are read through mmap, so reading one costs the same whatever the size of the dataset.
+    # A record appended again under the same ID replaces the previous one. A missing file is an
+    # error, unless create is set to start a new dataset
+    def __init__(self, path: str, create: bool = False):
+        if not create and not os.path.exists(path):
+            raise FileNotFoundError(f"No packed dataset at {path}")
+        self.path = path
+        self.index_path = path + ".idx"
+        self._offsets: dict[str, tuple[int, int]] = {}
+        # Bytes of the file covered by the index, and (offset, length, crc32) of the last indexed record
+        self._indexed = 0
+        self._last: Optional[tuple[int, int, int]] = None
+        self._map: Optional[mmap.mmap] = None
+        self._inode: Optional[int] = None
+        self._read_index()
+        self.refresh()
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __contains__(self, record_id: str) -> bool:
+        return record_id in self._offsets
+
+    def __getitem__(self, record_id: str) -> Any:
+        offset, length = self._offsets[record_id]
+        return json.loads(self._map[offset : offset + length])["result"]
+
+    def __iter__(self) -> Iterator[tuple[str, Any]]:
+        # (id, record) in file order
+        for record_id, (offset, length) in sorted(self._offsets.items(), key=lambda item: item[1][0]):
+            yield record_id, json.loads(self._map[offset : offset + length])["result"]
+
+    def get(self, record_id: str, default: Any = None) -> Any:
+        return self[record_id] if record_id in self._offsets else default
+
+    def ids(self) -> list[str]:
+        return list(self._offsets)
+
+    def append(self, record_id: str, record: Any) -> None:
+        self.extend([(record_id, record)])
+
+    def extend(self, records: Iterable[tuple[str, Any]]) -> int:
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        n_records = 0
+        with open(self.path, "a") as f:
+            for record_id, record in records:
+                f.write(json.dumps({"id": record_id, "result": record}) + "\n")
+                n_records += 1
+            f.flush()
+            os.fsync(f.fileno())
+        self.refresh()
+        return n_records
+
+    def refresh(self) -> None:
+        # Indexes the records appended since the last call, also by other processes
+        stat = os.stat(self.path) if os.path.exists(self.path) else None
+        size = stat.st_size if stat is not None else 0
+        if not self._index_matches(size):
+            # The file was rewritten, the index is rebuilt
+            self.close()
+            self._reset_index()
+        if stat is not None and (stat.st_ino != self._inode or size != (len(self._map) if self._map else 0)):
+            self.close()
+            with open(self.path, "rb") as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+            self._inode = stat.st_ino
+        entries = []
+        position = self._indexed
+        while position < size:
+            end = self._map.find(b"\n", position)
+            if end == -1:
+                # A record being written, it is indexed once complete
+                break
+            line = self._map[position:end]
+            if line.strip():
+                entries.append((json.loads(line)["id"], position, end - position, zlib.crc32(line)))
+            position = end + 1
+        if entries:
+            with open(self.index_path, "a") as f:
+                f.writelines(f"{record_id}\t{offset}\t{length}\t{crc}\n" for record_id, offset, length, crc in entries)
+            self._last = entries[-1][1:]
+        for record_id, offset, length, _ in entries:
+            self._offsets.pop(record_id, None)
+            self._offsets[record_id] = (offset, length)
+        self._indexed = position
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def _read_index(self) -> None:
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path) as f:
+            for line in f:
+                fields = line.rstrip("\n").split("\t")
+                if not line.endswith("\n") or len(fields) != 4:
+                    # Truncated, or written by an older version without checksums
+                    self._reset_index()
+                    return
+                record_id, offset, length, crc = fields[0], int(fields[1]), int(fields[2]), int(fields[3])
+                self._offsets.pop(record_id, None)
+                self._offsets[record_id] = (offset, length)
+                if offset + length + 1 > self._indexed:
+                    self._indexed = offset + length + 1
+                    self._last = (offset, length, crc)
+
+    def _index_matches(self, size: int) -> bool:
+        # The file still holds the last indexed record where the index says, so it was only appended to
+        if self._last is None:
+            return True
+        if size < self._indexed:
+            return False
+        offset, length, crc = self._last
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            line = f.read(length + 1)
+        return line.endswith(b"\n") and zlib.crc32(line[:-1]) == crc
+
+    def _reset_index(self) -> None:
+        self._offsets = {}
+        self._indexed = 0
+        self._last = None
+        if os.path.exists(self.index_path):
+            os.remove(self.index_path)
+
+
+def iter_folder(folder: str) -> Iterator[tuple[str, Any]]:
+    # (id, record) of the files named like prompt_N.txt or answer_N.json, by ID. JSON files are
+    # parsed, other files are read as text
+    files = [(item_id(name), name) for name in os.listdir(folder) if item_id(name) is not None]
+    for record_id, name in sorted(files, key=lambda file: int(file[0])):
+        with open(os.path.join(folder, name)) as f:
+            yield record_id, json.load(f) if name.endswith(".json") else f.read()
+
+
+def read_dataset(path: str) -> Iterator[tuple[str, Any]]:
+    # Records of a folder in the one file per record layout, or of a packed dataset
+    if os.path.isdir(path):
+        return iter_folder(path)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No packed dataset or folder at {path}")
+    return iter(PackedDataset(path))
+
+
+def pack_folder(folder: str, path: str) -> int:
+    return PackedDataset(path, create=True).extend(iter_folder(folder))
+
+
+def unpack(path: str, folder: str, name_format: str = "prediction_{}.json") -> int:
+    # Writes every record to its own file, name_format.format(id), as JSON if the name ends with .json
+    os.makedirs(folder, exist_ok=True)
+    n_records = 0
+    for record_id, record in PackedDataset(path):
+        with open(os.path.join(folder, name_format.format(record_id)), "w") as f:
+            if name_format.endswith(".json"):
+                json.dump(record, f, indent=2)
+            else:
+                f.write(record)
+        n_records += 1
+    return n_records
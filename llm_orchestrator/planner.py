@@ -0,0 +1,71 @@
+import time
+from typing import Any, Iterator
+
+from llm_orchestrator.inventory import Inventory
+from llm_orchestrator.json_stream import JSONArrayStreamParser
+from llm_orchestrator.timing import StageTimer
+
+
+class Planner:
+    def __init__(self, interface, system_prompt: str, grammar: Any, inventory: Inventory):
+        self.interface = interface
+        self.system_prompt = system_prompt
+        self.grammar = grammar
+        self.inventory = inventory
+        self.timer = StageTimer()
+        # The system prompt is shared by all the questions, prefill it once
+        self.interface.set_prefix("[INST]" + system_prompt)
+
+    def plan(self, question: str, owner: str = "") -> list[dict]:
+        return list(self.plan_stream(question, owner))
+
+    def plan_stream(self, question: str, owner: str = "") -> Iterator[dict]:
+        # Each task is parsed, given its interface IDs and handed to the caller as soon as its
+        # object is closed, while the rest of the task list is still being decoded.
+        # The interface IDs are allocated in the inventory on behalf of owner
+        parser = JSONArrayStreamParser()
+        for text in self.generate_task_list(question):
+            with self.timer.stage("parse"):
+                tasks = parser.feed(text)
+            for task in tasks:
+                with self.timer.stage("id_assignment"):
+                    self.assign_ids(task, owner)
+                yield task
+        parser.close()
+
+    def generate_task_list(self, question: str) -> Iterator[str]:
+        # Generate the tokens for the full prompt
+        # Mistral Instruct requires two special tokens to start and end the prompt
+        with self.timer.stage("tokenize"):
+            tokens = self.interface.tokenize(
+                "[INST]" + self.system_prompt + "User: " + question + "Assistant:\n" "[/INST]"
+            )
+        # Single grammar-constrained generation, streamed so that the time to the first
+        # token (prefill) can be told apart from the rest of the decoding
+        start = time.perf_counter()
+        output = self.interface.generate(tokens, max_tokens=0, seed=42, grammar=self.grammar, stream=True)
+        prefill_end = None
+        decode_time = 0.0
+        for chunk in output:
+            now = time.perf_counter()
+            if prefill_end is None:
+                prefill_end = now
+            else:
+                decode_time += now - resume
+            yield chunk["choices"][0]["text"]
+            # Time spent by the caller on the yielded text is not decoding time
+            resume = time.perf_counter()
+        if prefill_end is None:
+            prefill_end = time.perf_counter()
+        self.timer.record("prefill", prefill_end - start)
+        self.timer.record("decode", decode_time)
+
+    def assign_ids(self, task: dict, owner: str = "") -> None:
+        # Assignment of nodes to source and sink interface IDs
+        if task["task"] != "Measurement":
+            source_id = self.inventory.allocate(task["source"], task["task"], owner)
+            sink_id = self.inventory.allocate(task["sink"], task["task"], owner)
+            task["description"] += f" ID of the source interface: {source_id}, ID of the sink interface: {sink_id}"
+            # Also kept as structured fields for the executor templates
+            task["source_id"] = source_id
+            task["sink_id"] = sink_id
@@ -0,0 +1,80 @@
+import json
+import os
+from typing import Any
+
+from jsonschema.validators import Draft202012Validator
+
+
+class SchemaEntry:
+    def __init__(self, file_name: str, schema: dict, mtime: float):
+        self.file_name = file_name
+        self.schema = schema
+        self.mtime = mtime
+        self.validator = Draft202012Validator(schema)
+        self.discriminators = self._find_discriminators(schema)
+
+    def matches(self, data: Any) -> bool:
+        # A document is routed to this schema unless it carries one of the schema's discriminator
+        # keys with another value. A document without any of the keys (e.g. a measurement leaving
+        # out the optional configurationState) is still a candidate
+        if not self.discriminators or not isinstance(data, dict):
+            return False
+        return all(data[key] == value for key, value in self.discriminators.items() if key in data)
+
+    def matched_keys(self, data: Any) -> int:
+        return sum(key in data for key in self.discriminators) if isinstance(data, dict) else 0
+
+    @staticmethod
+    def _find_discriminators(schema: dict) -> dict:
+        # Top-level properties that admit exactly one value (e.g. "className": "Connection",
+        # "hierarchicalLevel": "service") identify the kind of document the schema describes
+        discriminators = {}
+        for key, value in schema.get("properties", {}).items():
+            if "const" in value:
+                discriminators[key] = value["const"]
+            elif len(value.get("enum", [])) == 1:
+                discriminators[key] = value["enum"][0]
+        return discriminators
+
+
+class SchemaRegistry:
+    def __init__(self, schema_dir: str):
+        self._schema_dir = schema_dir
+        self._dir_mtime = None
+        self._entries: dict[str, SchemaEntry] = {}
+        self.refresh()
+
+    def refresh(self) -> None:
+        # Only re-read schema files whose mtime changed since the last call
+        dir_mtime = os.stat(self._schema_dir).st_mtime
+        if dir_mtime != self._dir_mtime:
+            file_names = sorted(f for f in os.listdir(self._schema_dir) if f.endswith(".json"))
+            self._dir_mtime = dir_mtime
+        else:
+            file_names = list(self._entries.keys())
+        entries = {}
+        for file_name in file_names:
+            path = os.path.join(self._schema_dir, file_name)
+            mtime = os.stat(path).st_mtime
+            entry = self._entries.get(file_name)
+            if entry is None or entry.mtime != mtime:
+                with open(path) as f:
+                    schema = json.load(f)
+                Draft202012Validator.check_schema(schema)
+                entry = SchemaEntry(file_name, schema, mtime)
+            entries[file_name] = entry
+        self._entries = entries
+
+    def entries(self) -> list[SchemaEntry]:
+        return list(self._entries.values())
+
+    def get(self, file_name: str) -> SchemaEntry:
+        return self._entries[file_name]
+
+    def route(self, data: Any) -> list[SchemaEntry]:
+        # Schemas whose discriminators the document does not contradict, those sharing the most
+        # discriminator keys with it first. Schemas without discriminators (e.g. the task list
+        # schema) are tried last
+        candidates = [entry for entry in self._entries.values() if entry.matches(data)]
+        candidates.sort(key=lambda entry: -entry.matched_keys(data))
+        return candidates + [entry for entry in self._entries.values() if not entry.discriminators]
@@ -0,0 +1,73 @@
+import json
+import re
+from typing import Any, Callable, Union
+
+NON_ALPHANUMERIC_PATTERN = re.compile(r"[^a-z0-9]")
+
+
+class SchemaRenderer:
+    # Renders JSON schemas as a compact type notation for prompts, e.g.
+    # {name:string,protection:boolean=false,connLps:[{className:"ConnLpOtu",rate:"otu2x"|"otu4"}]}
+    # Enums are collapsed, whitespace and schema metadata are stripped, and the default and description
+    # of a single-value enum are dropped since the grammar forces that value anyway. The grammar built
+    # from the full schema stays the source of truth, the rendering only tells the model what to write
+    def __init__(self, descriptions: bool = True):
+        self.descriptions = descriptions
+        self._cache: dict[str, str] = {}
+
+    def render(self, schema: Union[str, dict]) -> str:
+        # Renderings are cached by schema content
+        if not isinstance(schema, str):
+            schema = json.dumps(schema)
+        rendered = self._cache.get(schema)
+        if rendered is None:
+            rendered = self._render(json.loads(schema))
+            self._cache[schema] = rendered
+        return rendered
+
+    def render_file(self, schema_path: str) -> str:
+        with open(schema_path) as f:
+            return self.render(f.read())
+
+    def token_counts(self, schema: str, tokenize: Callable[[str], Any]) -> tuple[int, int]:
+        # Number of prompt tokens of the raw schema text and of its rendering, with the model tokenizer
+        return len(tokenize(schema)), len(tokenize(self.render(schema)))
+
+    def _render(self, schema: dict, key: str = "") -> str:
+        values = schema.get("enum")
+        if values is None and "const" in schema:
+            values = [schema["const"]]
+        if values is not None:
+            text = "|".join(self._value(value) for value in values)
+        elif "properties" in schema:
+            required = schema.get("required")
+            fields = []
+            for name, field_schema in schema["properties"].items():
+                # Only objects listing their required keys mark the others as optional
+                optional = "?" if required is not None and name not in required else ""
+                fields.append(f"{name}{optional}:{self._render(field_schema, name)}")
+            text = "{" + ",".join(fields) + "}"
+        elif schema.get("type") == "array" and "items" in schema:
+            text = "[" + self._render(schema["items"]) + "]"
+        else:
+            text = schema.get("type", "any")
+            if isinstance(text, list):
+                text = "|".join(text)
+        if values is not None and len(values) == 1:
+            # The grammar forces the value, its default and description are noise
+            return text
+        if "default" in schema:
+            text += "=" + self._value(schema["default"])
+        description = schema.get("description")
+        if self.descriptions and description and not self._restates(description, key):
+            text += f" ({description})"
+        return text
+
+    @staticmethod
+    def _value(value: Any) -> str:
+        return json.dumps(value, separators=(",", ":"))
+
+    @staticmethod
+    def _restates(description: str, key: str) -> bool:
+        # Descriptions that only repeat the key name (e.g. "tag" for tag) carry no information
+        return NON_ALPHANUMERIC_PATTERN.sub("", description.lower()) == NON_ALPHANUMERIC_PATTERN.sub("", key.lower())
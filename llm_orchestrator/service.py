@@ -0,0 +1,147 @@
+import asyncio
+import json
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Optional
+
+from llm_orchestrator.executor import Executor
+from llm_orchestrator.inventory import Inventory
+from llm_orchestrator.planner import Planner
+from llm_orchestrator.verifier import Verifier
+
+
+class Orchestrator:
+    def __init__(
+        self, planner: Planner, executor: Executor, verifier: Verifier, inventory: Optional[Inventory] = None
+    ):
+        self.planner = planner
+        self.executor = executor
+        self.verifier = verifier
+        # Interface IDs of failed requests are released in the inventory
+        self.inventory = inventory
+        # A llama.cpp context must not be used by two threads at once, so each model gets a single
+        # thread. Planning of one request still overlaps with the execution of another
+        self._planner_thread = ThreadPoolExecutor(max_workers=1)
+        self._executor_thread = ThreadPoolExecutor(max_workers=1)
+
+    async def run(self, question: str, owner: Optional[str] = None) -> AsyncIterator[dict]:
+        # Interface IDs allocated for this request are recorded in the inventory under owner
+        owner = owner or uuid.uuid4().hex
+        loop = asyncio.get_running_loop()
+        tasks: asyncio.Queue = asyncio.Queue()
+
+        # Tasks are streamed out of the planner as soon as they are decoded, so the execution of
+        # the first task overlaps with the planning of the following ones
+        def plan():
+            try:
+                for task in self.planner.plan_stream(question, owner):
+                    loop.call_soon_threadsafe(tasks.put_nowait, task)
+            except Exception as e:
+                loop.call_soon_threadsafe(tasks.put_nowait, e)
+            else:
+                loop.call_soon_threadsafe(tasks.put_nowait, None)
+
+        planning = loop.run_in_executor(self._planner_thread, plan)
+        # A request that fails or yields invalid commands is not deployed, its allocations are released
+        succeeded = False
+        try:
+            all_valid = True
+            index = 0
+            while (task := await tasks.get()) is not None:
+                if isinstance(task, Exception):
+                    raise task
+                try:
+                    command = await loop.run_in_executor(self._executor_thread, self.executor.execute, task)
+                except json.JSONDecodeError as e:
+                    all_valid = False
+                    yield {"index": index, "task": task, "command": None, "valid": False, "errors": [str(e)]}
+                else:
+                    valid, errors = self.verifier.verify(command)
+                    errors = [] if valid else errors
+                    all_valid = all_valid and valid
+                    yield {"index": index, "task": task, "command": command, "valid": valid, "errors": errors}
+                index += 1
+            await planning
+            succeeded = all_valid
+        finally:
+            if not succeeded and self.inventory is not None:
+                # The planner may still be allocating IDs for this request
+                await asyncio.gather(planning, return_exceptions=True)
+                self.inventory.release_owner(owner)
+
+    def release(self, owner: str) -> list[int]:
+        # Interface IDs allocated for a request, e.g. once its commands are removed from the network
+        return self.inventory.release_owner(owner) if self.inventory is not None else []
+
+    def close(self) -> None:
+        self._planner_thread.shutdown()
+        self._executor_thread.shutdown()
+
+
+class OrchestratorServer:
+    # Line-delimited JSON protocol: the client sends {"question": "..."} on one line, optionally with
+    # an "owner" for the interface IDs allocated to it, and the server streams back one line per
+    # validated command and a final {"done": true, "owner": ...} line. {"release": owner} frees the
+    # interface IDs of a request, the server answers {"released": [...]} and {"done": true}
+    def __init__(self, orchestrator: Orchestrator, n_workers: int = 2, max_queue_size: int = 64):
+        self.orchestrator = orchestrator
+        self.n_workers = n_workers
+        self.max_queue_size = max_queue_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: list[asyncio.Task] = []
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765, unix_socket: Optional[str] = None):
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.n_workers)]
+        if unix_socket is not None:
+            return await asyncio.start_unix_server(self._handle_connection, path=unix_socket)
+        return await asyncio.start_server(self._handle_connection, host=host, port=port)
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _worker(self) -> None:
+        while True:
+            question, owner, responses = await self._queue.get()
+            try:
+                async for result in self.orchestrator.run(question, owner):
+                    await responses.put(result)
+            except Exception as e:
+                await responses.put({"error": f"{type(e).__name__}: {e}"})
+            finally:
+                await responses.put(None)
+                self._queue.task_done()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while line := await reader.readline():
+                try:
+                    request = json.loads(line)
+                    if "release" in request:
+                        await self._send(writer, {"released": self.orchestrator.release(str(request["release"]))})
+                        await self._send(writer, {"done": True})
+                        continue
+                    question = request["question"]
+                    owner = str(request.get("owner") or uuid.uuid4().hex)
+                except (json.JSONDecodeError, KeyError, TypeError, AttributeError):
+                    await self._send(writer, {"error": 'Expected a JSON object with a "question" or "release" field'})
+                    continue
+                responses: asyncio.Queue = asyncio.Queue()
+                try:
+                    self._queue.put_nowait((question, owner, responses))
+                except asyncio.QueueFull:
+                    await self._send(writer, {"error": "Request queue is full"})
+                    continue
+                while (result := await responses.get()) is not None:
+                    await self._send(writer, result)
+                await self._send(writer, {"done": True, "owner": owner})
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _send(writer: asyncio.StreamWriter, message: dict) -> None:
+        writer.write(json.dumps(message).encode("utf-8") + b"\n")
+        await writer.drain()
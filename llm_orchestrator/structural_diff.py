@@ -0,0 +1,123 @@
+import re
+from typing import Any, Optional
+
+# Keys tried, in order, to match the elements of arrays of objects (e.g. connEndPoints by endType)
+ARRAY_KEYS = ("endType", "className")
+
+IDENTIFIER_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+_MISSING = object()
+
+
+def structural_diff(
+    data: Any,
+    ground_truth: Any,
+    schema: Optional[dict] = None,
+    array_keys: tuple[str, ...] = ARRAY_KEYS,
+) -> list[dict]:
+    # Walks data, ground truth and schema together in a single iterative pass and returns every
+    # difference as {"path", "field", "kind", "expected", "actual"}, in document order.
+    # kind is "missing" (only in the ground truth), "unexpected" (only in the data) or "mismatch".
+    # A key missing on one side takes the schema default, if any, before being compared
+    differences = []
+    # Stack of (path, top-level field, data, ground truth, schema)
+    stack = [("$", None, data, ground_truth, schema or {})]
+    while stack:
+        path, field, actual, expected, node_schema = stack.pop()
+        if actual is _MISSING or expected is _MISSING:
+            default = node_schema.get("default", _MISSING)
+            if actual is _MISSING:
+                actual = default
+            else:
+                expected = default
+            if actual is _MISSING:
+                differences.append(_record(path, field, "missing", expected, None))
+                continue
+            if expected is _MISSING:
+                differences.append(_record(path, field, "unexpected", None, actual))
+                continue
+
+        children = []
+        if isinstance(actual, dict) and isinstance(expected, dict):
+            properties = node_schema.get("properties", {})
+            for key in list(expected) + [key for key in actual if key not in expected]:
+                child_path = f"{path}.{key}" if IDENTIFIER_PATTERN.match(key) else f"{path}[{key!r}]"
+                children.append(
+                    (
+                        child_path,
+                        key if field is None else field,
+                        actual.get(key, _MISSING),
+                        expected.get(key, _MISSING),
+                        properties.get(key, {}),
+                    )
+                )
+        elif isinstance(actual, list) and isinstance(expected, list):
+            items_schema = node_schema.get("items", {})
+            for actual_index, expected_index in _match_elements(actual, expected, array_keys):
+                index = expected_index if expected_index is not None else actual_index
+                children.append(
+                    (
+                        f"{path}[{index}]",
+                        field,
+                        actual[actual_index] if actual_index is not None else _MISSING,
+                        expected[expected_index] if expected_index is not None else _MISSING,
+                        items_schema,
+                    )
+                )
+        elif not _equal(actual, expected):
+            differences.append(_record(path, field, "mismatch", expected, actual))
+        # Children are pushed in reverse so that they are popped in document order
+        stack.extend(reversed(children))
+    return differences
+
+
+def _match_elements(
+    actual: list, expected: list, array_keys: tuple[str, ...]
+) -> list[tuple[Optional[int], Optional[int]]]:
+    # Pairs array elements by the first key whose values identify the objects on both sides.
+    # Elements left unmatched are paired by position, the rest is missing or unexpected
+    pairs = []
+    unmatched_actual = list(range(len(actual)))
+    unmatched_expected = list(range(len(expected)))
+    for key in array_keys:
+        actual_index = _index_by(actual, key)
+        expected_index = _index_by(expected, key)
+        if actual_index is None or expected_index is None:
+            continue
+        for value, index in expected_index.items():
+            if value in actual_index:
+                pairs.append((actual_index[value], index))
+        matched_actual = {actual_i for actual_i, _ in pairs}
+        matched_expected = {expected_i for _, expected_i in pairs}
+        unmatched_actual = [i for i in unmatched_actual if i not in matched_actual]
+        unmatched_expected = [i for i in unmatched_expected if i not in matched_expected]
+        break
+    for actual_i, expected_i in zip(unmatched_actual, unmatched_expected):
+        pairs.append((actual_i, expected_i))
+    n_paired = min(len(unmatched_actual), len(unmatched_expected))
+    pairs += [(None, expected_i) for expected_i in unmatched_expected[n_paired:]]
+    pairs += [(actual_i, None) for actual_i in unmatched_actual[n_paired:]]
+    pairs.sort(key=lambda pair: (pair[1] if pair[1] is not None else len(expected) + pair[0]))
+    return pairs
+
+
+def _index_by(elements: list, key: str) -> Optional[dict]:
+    # Maps the value of key to the element position, if every element is an object with a unique value
+    index = {}
+    for i, element in enumerate(elements):
+        if not isinstance(element, dict) or key not in element:
+            return None
+        value = element[key]
+        if not isinstance(value, (str, int, float, bool)) or value in index:
+            return None
+        index[value] = i
+    return index
+
+
+def _equal(a: Any, b: Any) -> bool:
+    # True == 1 in Python, but not in JSON
+    return a == b and isinstance(a, bool) == isinstance(b, bool)
+
+
+def _record(path: str, field: Optional[str], kind: str, expected: Any, actual: Any) -> dict:
+    return {"path": path, "field": field, "kind": kind, "expected": expected, "actual": actual}
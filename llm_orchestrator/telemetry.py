@@ -0,0 +1,237 @@
+import cProfile
+import json
+import os
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, ContextManager, Iterator, Optional
+
+from llm_orchestrator.timing import StageTimer
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+METRICS = {
+    "llm_requests_total": ("counter", "LLM calls, by completion cache result"),
+    "llm_prompt_tokens_total": ("counter", "Prompt tokens sent to the model"),
+    "llm_prompt_tokens_reused_total": ("counter", "Prompt tokens reused from the KV cache instead of being evaluated"),
+    "llm_completion_tokens_total": ("counter", "Tokens decoded by the model"),
+    "llm_prefix_cache_total": ("counter", "Prefix state lookups on disk, by result"),
+    "llm_prefill_seconds": ("histogram", "Time to the first decoded token"),
+    "llm_decode_seconds": ("histogram", "Time spent decoding after the first token"),
+    "llm_decode_tokens_per_second": ("gauge", "Decoding throughput over all the calls"),
+    "llm_stage_seconds_total": ("counter", "Time spent in each pipeline stage"),
+    "llm_stage_calls_total": ("counter", "Calls of each pipeline stage"),
+}
+
+
+class Telemetry:
+    # Per-call inference metrics, aggregated by model role and exported in the Prometheus text
+    # format. Every call can also be logged as a JSON line, and stages can be traced with hooks
+    def __init__(self, log_path: Optional[str] = None, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._values: dict[str, dict[tuple, float]] = {name: {} for name in METRICS}
+        self._histograms: dict[str, dict[tuple, list]] = {}
+        self._decode_totals: dict[tuple, list[float]] = {}
+        self._timers: dict[str, StageTimer] = {}
+        self._tracers: list[Callable[[str, dict], ContextManager]] = []
+        self._log = None
+        if log_path is not None:
+            if os.path.dirname(log_path):
+                os.makedirs(os.path.dirname(log_path), exist_ok=True)
+            self._log = open(log_path, "a")
+
+    def record_call(
+        self,
+        role: str,
+        prompt_tokens: int,
+        reused_tokens: int,
+        completion_tokens: int,
+        prefill_seconds: float,
+        decode_seconds: float,
+        grammar: bool,
+        cache: str,
+    ) -> None:
+        # cache is "hit", "miss" or "off". Decoding is labeled by grammar use, so the cost of
+        # grammar-constrained sampling shows up as the throughput gap between the two series
+        labels = (("role", role),)
+        decode_labels = labels + (("grammar", str(grammar).lower()),)
+        with self._lock:
+            self._add("llm_requests_total", labels + (("cache", cache),), 1)
+            self._add("llm_prompt_tokens_total", labels, prompt_tokens)
+            self._add("llm_prompt_tokens_reused_total", labels, reused_tokens)
+            self._add("llm_completion_tokens_total", labels, completion_tokens)
+            if cache != "hit":
+                self._observe("llm_prefill_seconds", labels, prefill_seconds)
+                self._observe("llm_decode_seconds", decode_labels, decode_seconds)
+                totals = self._decode_totals.setdefault(decode_labels, [0.0, 0.0])
+                totals[0] += completion_tokens
+                totals[1] += decode_seconds
+                if totals[1] > 0:
+                    self._values["llm_decode_tokens_per_second"][decode_labels] = totals[0] / totals[1]
+            if self._log is not None:
+                record = {
+                    "time": time.time(),
+                    "role": role,
+                    "cache": cache,
+                    "grammar": grammar,
+                    "prompt_tokens": prompt_tokens,
+                    "reused_tokens": reused_tokens,
+                    "completion_tokens": completion_tokens,
+                    "prefill_seconds": prefill_seconds,
+                    "decode_seconds": decode_seconds,
+                    "tokens_per_second": completion_tokens / decode_seconds if decode_seconds > 0 else None,
+                }
+                self._log.write(json.dumps(record) + "\n")
+                self._log.flush()
+
+    def record_prefix_lookup(self, role: str, hit: bool) -> None:
+        with self._lock:
+            self._add("llm_prefix_cache_total", (("role", role), ("result", "hit" if hit else "miss")), 1)
+
+    def track_stream(
+        self,
+        role: str,
+        chunks: Iterator[dict],
+        prompt_tokens: int,
+        reused_tokens: int,
+        grammar: bool,
+        cache: str,
+    ) -> Iterator[dict]:
+        # Wraps a llama.cpp completion stream: the wait for the first chunk is the prefill, each
+        # chunk is one decoded token. Time spent by the caller between chunks is not counted
+        start = time.perf_counter()
+        first = None
+        resume = start
+        decode_seconds = 0.0
+        n_chunks = 0
+        try:
+            for chunk in chunks:
+                now = time.perf_counter()
+                if first is None:
+                    first = now
+                else:
+                    decode_seconds += now - resume
+                n_chunks += 1
+                yield chunk
+                resume = time.perf_counter()
+        finally:
+            prefill_seconds = (first if first is not None else time.perf_counter()) - start
+            self.record_call(
+                role, prompt_tokens, reused_tokens, n_chunks, prefill_seconds, decode_seconds, grammar, cache
+            )
+
+    def register_timer(self, component: str, timer: StageTimer) -> None:
+        # The stage totals of the timer are exported with the other metrics, and its stages are traced
+        self._timers[component] = timer
+        timer.tracer = lambda name: self.span(f"{component}.{name}")
+
+    def add_tracer(self, tracer: Callable[[str, dict], ContextManager]) -> None:
+        # tracer(name, attributes) must return a context manager wrapping the span, e.g.
+        # lambda name, attributes: otel_tracer.start_as_current_span(name, attributes=attributes)
+        self._tracers.append(tracer)
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        with ExitStack() as stack:
+            for tracer in self._tracers:
+                stack.enter_context(tracer(name, attributes))
+            yield
+
+    @staticmethod
+    @contextmanager
+    def profile(path: str):
+        # cProfile the enclosed block and dump the stats to path (readable with pstats or snakeviz)
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield profiler
+        finally:
+            profiler.disable()
+            profiler.dump_stats(path)
+
+    def prometheus(self) -> str:
+        with self._lock:
+            for component, timer in self._timers.items():
+                # Pipeline threads add stages while this runs on the HTTP thread, so the timer dicts
+                # are copied (atomically under the GIL) rather than iterated
+                totals, counts = dict(timer.totals), dict(timer.counts)
+                for stage, total in totals.items():
+                    labels = (("component", component), ("stage", stage))
+                    self._values["llm_stage_seconds_total"][labels] = total
+                    self._values["llm_stage_calls_total"][labels] = counts.get(stage, 0)
+            lines = []
+            for name, (metric_type, description) in METRICS.items():
+                lines.append(f"# HELP {name} {description}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                if metric_type == "histogram":
+                    for labels, (counts, total, count) in self._histograms.get(name, {}).items():
+                        cumulative = 0
+                        for bound, bucket_count in zip(self.buckets, counts):
+                            cumulative += bucket_count
+                            lines.append(f"{name}_bucket{_labels(labels + (('le', repr(bound)),))} {cumulative}")
+                        lines.append(f"{name}_bucket{_labels(labels + (('le', '+Inf'),))} {count}")
+                        lines.append(f"{name}_sum{_labels(labels)} {total}")
+                        lines.append(f"{name}_count{_labels(labels)} {count}")
+                else:
+                    for labels, value in self._values[name].items():
+                        lines.append(f"{name}{_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> None:
+        # Atomic write, for the node exporter textfile collector
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(self.prometheus())
+        os.replace(tmp_path, path)
+
+    def serve_metrics(self, host: str = "127.0.0.1", port: int = 9464) -> ThreadingHTTPServer:
+        # Serve the metrics at /metrics from a daemon thread, for Prometheus to scrape
+        telemetry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = telemetry.prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    def close(self) -> None:
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+    def _add(self, name: str, labels: tuple, value: float) -> None:
+        self._values[name][labels] = self._values[name].get(labels, 0) + value
+
+    def _observe(self, name: str, labels: tuple, value: float) -> None:
+        histogram = self._histograms.setdefault(name, {}).setdefault(labels, [[0] * len(self.buckets), 0.0, 0])
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                histogram[0][i] += 1
+                break
+        histogram[1] += value
+        histogram[2] += 1
+
+
+def _labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,151 @@
+import re
+from typing import Optional
+
+from llm_orchestrator.verifier import Verifier
+
+NAME_PATTERN = re.compile(r"\bnamed?\s+(?:is\s+|should be\s+|as\s+)?['\"]([^'\"]+)['\"]", re.IGNORECASE)
+IDS_PATTERN = re.compile(r"ID of the source interface: (\d+), ID of the sink interface: (\d+)")
+UNPROTECTED_PATTERN = re.compile(r"\b(unprotected|not protected|without protection|no protection)\b", re.IGNORECASE)
+PROTECTED_PATTERN = re.compile(r"\bprotect(ed|ion)\b", re.IGNORECASE)
+# Wording near a mention of protection or routing that may turn it off, e.g. "protection should be disabled"
+NEGATION_PATTERN = re.compile(r"\b(not|no|none|never|without|disabled?|false|off)\b|n't\b", re.IGNORECASE)
+STATE_WORD_PATTERN = re.compile(r"\b(defined|routed|implemented)\b", re.IGNORECASE)
+# Only an explicit state is taken, "routed according to the byHops criteria" is not one
+STATE_PATTERN = re.compile(
+    r"\bstate\b[^.,;]*?\b(?:is|be|set\s+(?:as|to))\s+(defined|routed|implemented)\b", re.IGNORECASE
+)
+RATE_PATTERN = re.compile(r"\b(1|10)\s?G(?:b|bps|bit)?\b", re.IGNORECASE)
+HOPS_PATTERN = re.compile(r"\b(by\s?hops|number of hops|hop count)\b", re.IGNORECASE)
+COST_PATTERN = re.compile(r"\b(by\s?)?administrative\s?cost\b", re.IGNORECASE)
+LENGTH_PATTERN = re.compile(r"\b(by\s?length|shortest (path|route))\b", re.IGNORECASE)
+ROUTING_PATTERNS = {"byHops": HOPS_PATTERN, "byAdministrativeCost": COST_PATTERN, "byLength": LENGTH_PATTERN}
+MINUTES_PATTERN = re.compile(r"\b15[- ]?min", re.IGNORECASE)
+HOURS_PATTERN = re.compile(r"\b24[- ]?h", re.IGNORECASE)
+# Requirements the templates do not model: tasks mentioning them are left to the LLM
+UNSUPPORTED_PATTERN = re.compile(
+    r"\b(fec|hold[- ]?off|revertive|sncp|wtr|wait(ing)? time|customer|tag|group|alarm|profile|"
+    r"administrative\s?cost\s+(of|is|=)?\s*\d)",
+    re.IGNORECASE,
+)
+# Performance monitoring of a connection ("pm" with one of several enabled modes) is left to the LLM
+MONITORING_PATTERN = re.compile(r"\b(monitor\w*|pm|performance|15[- ]?min\w*|24[- ]?h\w*)\b", re.IGNORECASE)
+
+
+class TemplateEngine:
+    # Deterministic fast path for the executor: builds the JSON command of tasks whose requirements
+    # are fully understood from the task fields and description, and checks it against the schemas
+    def __init__(self, verifier: Verifier):
+        self.verifier = verifier
+
+    def build(self, task: dict) -> Optional[dict]:
+        description = task.get("description", "")
+        if UNSUPPORTED_PATTERN.search(description):
+            return None
+        if task["task"] == "Measurement":
+            command = self._build_measurement(description)
+        else:
+            command = self._build_connection(task, description)
+        if command is None:
+            return None
+        valid, _ = self.verifier.verify(command)
+        return command if valid else None
+
+    def _build_connection(self, task: dict, description: str) -> Optional[dict]:
+        if MONITORING_PATTERN.search(description):
+            return None
+        name = self._single_match(NAME_PATTERN, description)
+        source_id, sink_id = task.get("source_id"), task.get("sink_id")
+        if source_id is None or sink_id is None:
+            match = IDS_PATTERN.search(description)
+            if match is None:
+                return None
+            source_id, sink_id = int(match.group(1)), int(match.group(2))
+        states = {state.lower() for state in STATE_PATTERN.findall(description)}
+        if not states and STATE_WORD_PATTERN.search(description):
+            # A state word outside of an explicit state requirement is left to the LLM
+            return None
+        protection = self._protection(description)
+        routing_criteria = self._routing_criteria(description)
+        if name is None or len(states) > 1 or protection is None or routing_criteria is None:
+            return None
+
+        if task["task"] == "Lightpath":
+            conn_lp = {"className": "ConnLpOtu", "rate": "otu2x"}
+            hierarchical_level = "infrastructure"
+        else:
+            rates = {f"{rate}Gb" for rate in RATE_PATTERN.findall(description)}
+            if len(rates) > 1:
+                return None
+            rate = rates.pop() if rates else task["task"].split("-")[1]
+            conn_lp = {"className": "ConnLpEthCbr", "rate": rate}
+            hierarchical_level = "service"
+
+        return {
+            "className": "Connection",
+            "connEndPoints": [
+                {"className": "ConnEndPoint", "ltp": {"className": "Ltp", "id": source_id}, "endType": "source"},
+                {"className": "ConnEndPoint", "ltp": {"className": "Ltp", "id": sink_id}, "endType": "sink"},
+            ],
+            "routingCriteria": routing_criteria,
+            "sncpInfo": {"holdOffTime": 0, "revertive": True, "sncpType": "sncp_i", "wtrTime": 300},
+            "connLps": [conn_lp],
+            "configurationState": states.pop() if states else "implemented",
+            "hierarchicalLevel": hierarchical_level,
+            "name": name,
+            "protection": protection,
+        }
+
+    def _build_measurement(self, description: str) -> Optional[dict]:
+        name = self._single_match(NAME_PATTERN, description)
+        if name is None:
+            # Measurement descriptions usually quote the monitored lightpath/service without "name"
+            names = set(re.findall(r"['\"]([^'\"]+)['\"]", description))
+            name = names.pop() if len(names) == 1 else None
+        pm = {}
+        if MINUTES_PATTERN.search(description):
+            pm["cd15m"] = "enabledOnlyCurrent"
+        if HOURS_PATTERN.search(description):
+            pm["cd24h"] = "enabledOnlyCurrent"
+        if name is None or not pm:
+            return None
+        return {"configurationState": "started", "pm": pm, "transports": {"name": name}}
+
+    @staticmethod
+    def _protection(description: str) -> Optional[bool]:
+        # True or False if every mention of protection agrees, None if they disagree or if negation
+        # or disable wording other than the plain "unprotected" phrasings is found near one of them
+        unprotected = [match.span() for match in UNPROTECTED_PATTERN.finditer(description)]
+        values = {False for _ in unprotected}
+        for match in PROTECTED_PATTERN.finditer(description):
+            if any(start <= match.start() < end for start, end in unprotected):
+                continue
+            if TemplateEngine._negated(description, match):
+                return None
+            values.add(True)
+        if len(values) > 1:
+            return None
+        return values.pop() if values else False
+
+    @staticmethod
+    def _routing_criteria(description: str) -> Optional[str]:
+        # The routing criteria mentioned, byLength if none is. None if several are mentioned or if
+        # negation wording is found near one of them, e.g. "by length, not by hops"
+        criteria = set()
+        for criterion, pattern in ROUTING_PATTERNS.items():
+            for match in pattern.finditer(description):
+                if TemplateEngine._negated(description, match):
+                    return None
+                criteria.add(criterion)
+        if len(criteria) > 1:
+            return None
+        return criteria.pop() if criteria else "byLength"
+
+    @staticmethod
+    def _negated(description: str, match: re.Match) -> bool:
+        window = description[max(0, match.start() - 30) : match.end() + 30]
+        return NEGATION_PATTERN.search(window) is not None
+
+    @staticmethod
+    def _single_match(pattern: re.Pattern, text: str) -> Optional[str]:
+        matches = set(pattern.findall(text))
+        return matches.pop() if len(matches) == 1 else None
@@ -0,0 +1,48 @@
+import math
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager, nullcontext
+from typing import Callable, ContextManager, Optional
+
+
+class StageTimer:
+    def __init__(self, max_samples: int = 10000):
+        self.totals: dict[str, float] = defaultdict(float)
+        self.counts: dict[str, int] = defaultdict(int)
+        self.last: dict[str, float] = {}
+        # Percentiles are computed over the last max_samples calls of each stage, so that a
+        # long-running service does not keep every sample
+        self.samples: dict[str, deque[float]] = defaultdict(lambda: deque(maxlen=max_samples))
+        # Optional tracer(name) returning a context manager around each stage (see Telemetry)
+        self.tracer: Optional[Callable[[str], ContextManager]] = None
+
+    @contextmanager
+    def stage(self, name: str):
+        span = self.tracer(name) if self.tracer is not None else nullcontext()
+        start = time.perf_counter()
+        try:
+            with span:
+                yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name: str, seconds: float) -> None:
+        self.totals[name] += seconds
+        self.counts[name] += 1
+        self.last[name] = seconds
+        self.samples[name].append(seconds)
+
+    def percentile(self, name: str, q: float) -> float:
+        # Nearest-rank percentile over the sample window, q in [0, 100]
+        samples = sorted(self.samples[name])
+        if not samples:
+            return 0.0
+        rank = max(0, min(len(samples) - 1, math.ceil(q / 100 * len(samples)) - 1))
+        return samples[rank]
+
+    def summary(self) -> str:
+        lines = []
+        for name, total in self.totals.items():
+            count = self.counts[name]
+            lines.append(f"{name}: total {total:.3f}s, mean {total / count * 1000:.1f}ms over {count} calls")
+        return "\n".join(lines)
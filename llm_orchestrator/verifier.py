@@ -1,11 +1,11 @@
 import json
-import os
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Optional
 
-from jsonschema import validate
-from jsonschema.exceptions import ValidationError
-from jsonschema.validators import Draft202012Validator
+from jsonschema.exceptions import best_match
+
+from llm_orchestrator.schema_registry import SchemaRegistry
+from llm_orchestrator.structural_diff import structural_diff
 
 
 class AbstractVerifier(ABC):
@@ -17,35 +17,40 @@ class AbstractVerifier(ABC):
 class Verifier(AbstractVerifier):
     def __init__(self, schema_dir: str):
         self._schema_dir = schema_dir
-        self.node_to_id = {
-            "Node1": {
-                "Lightpath": [2269, 2270, 2273, 2275, 2283, 2286, 2291, 2295],
-                "Service-1Gb": [2272, 2274, 2279, 2280, 2282, 2284, 2287, 2288, 2289, 2290, 2292, 2294],
-                "Service-10Gb": [2271, 2276, 2277, 2278, 2281, 2285, 2293, 2296],
-            },
-            "Node2": {
-                "Lightpath": [2297, 2298, 2301, 2303, 2311, 2314, 2319, 2323],
-                "Service-1Gb": [2300, 2302, 2307, 2308, 2310, 2312, 2315, 2316, 2317, 2318, 2320, 2322],
-                "Service-10Gb": [2299, 2304, 2305, 2306, 2309, 2313, 2321, 2324],
-            },
-            "Node3": {
-                "Lightpath": [2357, 2358, 2361, 2363, 2371, 2374, 2379, 2383],
-                "Service-1Gb": [2360, 2362, 2367, 2368, 2370, 2372, 2375, 2376, 2377, 2378, 2380, 2382],
-                "Service-10Gb": [2359, 2364, 2365, 2366, 2369, 2373, 2381, 2384],
-            },
-        }
+        self._registry = SchemaRegistry(schema_dir)
 
     def verify(self, data: dict):
-        schema_files = self._load_schemas()
+        self._registry.refresh()
         errors = []
-        for file_name, schema in schema_files.items():
-            try:
-                validate(data, schema)
-                return (True, schema)
-            except ValidationError as e:
-                errors.append(f"Mismatch in {file_name} schema. Error message: {e.message}")
+        candidates = self._registry.route(data)
+        if not candidates:
+            return (False, ["Data does not match the discriminators of any schema"])
+        for entry in candidates:
+            error = best_match(entry.validator.iter_errors(data))
+            if error is None:
+                return (True, entry.schema)
+            errors.append(f"Mismatch in {entry.file_name} schema. Error message: {error.message}")
         return (False, errors)
 
+    def schema_name(self, data: Any) -> Optional[str]:
+        # Name of the schema file the document is routed to, e.g. "lightpath_schema.json": the first
+        # candidate the document is valid against, else the one closest to it by discriminators
+        candidates = self._registry.route(data)
+        for entry in candidates:
+            if entry.validator.is_valid(data):
+                return entry.file_name
+        return candidates[0].file_name if candidates else None
+
+    def schema(self, file_name: str) -> dict:
+        return self._registry.get(file_name).schema
+
+    def diff(self, data: Any, ground_truth: Any) -> list[dict]:
+        # Every difference between data and ground truth, with the defaults of the ground truth schema
+        self._registry.refresh()
+        schema_name = self.schema_name(ground_truth)
+        schema = self.schema(schema_name) if schema_name is not None else None
+        return structural_diff(data, ground_truth, schema)
+
     def score(self, data_list: list[dict], ground_truth_list: list[dict]) -> str:
         if len(data_list) != len(ground_truth_list):
             return f"Data and ground truth lists are not of the same length. Data length: {len(data_list)}, Ground truth length: {len(ground_truth_list)}"
@@ -54,29 +59,13 @@ class Verifier(AbstractVerifier):
             res, schema = self.verify(data)
             if not res:
                 return f"Data does not match any schema, {schema}"
-            if not data == ground_truth:
-
-                keys_truth = set(ground_truth.keys())
-                keys_data = set(data.keys())
-                _, err = self._compare_json_with_schema(data, ground_truth, schema)
-                error_report += err
-                for key in keys_data & keys_truth:
-                    if data[key] != ground_truth[key]:
-                        error_report.append(
-                            f"Value for key {key} does not match ground truth. Predicted value: {data[key]}, Ground truth value: {ground_truth[key]}"
-                        )
+            for difference in structural_diff(data, ground_truth, schema):
+                error_report.append(
+                    f"{difference['path']}: {difference['kind']}. Predicted value: {difference['actual']}, "
+                    f"Ground truth value: {difference['expected']}"
+                )
         return "\n".join(error_report)
 
-    def _load_schemas(self) -> dict:
-        schema_files = os.listdir(self._schema_dir)
-        schemas = {}
-        for schema_file in schema_files:
-            with open(os.path.join(self._schema_dir, schema_file)) as f:
-                schema = json.load(f)
-                Draft202012Validator.check_schema(schema)
-                schemas[schema_file] = schema
-        return schemas
-
     def _parse_llm_output(self, json_string: str):
         start_index = json_string.find("```json\n")
         if start_index == -1:  # No JSON block found
@@ -90,34 +79,3 @@ class Verifier(AbstractVerifier):
 
         return json.loads(json_body)
 
-    def _compare_json_with_schema(self, json1, json2, schema):
-        error_log = []
-
-        def add_error(key_path, reason):
-            nonlocal error_log
-            error_log.append(f"{key_path}: {reason}")
-
-        def compare_nested(json1, json2, schema, key_path=""):
-            for key, schema_value in schema["properties"].items():
-                new_key_path = key_path + "." + key if key_path else key
-                if key in json1:
-                    if key not in json2:
-                        if "default" in schema_value and json1[key] == schema_value["default"]:
-                            continue
-                        else:
-                            add_error(new_key_path, "Key missing in second JSON")
-                            return False  # Stop recursion if a mismatch is found
-                    elif isinstance(json1[key], dict) and isinstance(json2[key], dict):
-                        if not compare_nested(json1[key], json2[key], schema_value, new_key_path):
-                            return False
-                    else:
-                        if json1[key] != json2[key]:
-                            add_error(new_key_path, "Value mismatch")
-                            return False
-                elif key in json2 and key not in json1:
-                    add_error(new_key_path, "Missing key in predicted JSON")
-
-            return True  # Only reached if no mismatches were found
-
-        result = compare_nested(json1, json2, schema)
-        return result, error_log
@@ -0,0 +1,4 @@
+from llm_orchestrator.commands.pack import main
+
+if __name__ == "__main__":
+    main()
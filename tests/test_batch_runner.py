@@ -0,0 +1,91 @@
+import json
+
+import pytest
+
+from llm_orchestrator.batch_runner import BatchRunner, WorkManifest, parse_shard
+from llm_orchestrator.executor import BatchExecutor, Executor
+from llm_orchestrator.fake_llm import FakeLLMInterface
+from llm_orchestrator.packed_dataset import PackedDataset
+
+
+def name_command(prompt):
+    return json.dumps({"name": prompt.split("]", 1)[1].split("\n")[0]})
+
+
+def test_runners_share_the_work(tmp_path):
+    manifest_path = str(tmp_path / "manifest.sqlite")
+    output_path = str(tmp_path / "output.jsonl")
+    manifest = WorkManifest(manifest_path)
+    assert manifest.add((str(i), {"value": i}) for i in range(20)) == 20
+    assert manifest.add([("0", {"value": 0})]) == 0
+
+    # Two processes on the same manifest never get the same item
+    first = BatchRunner(WorkManifest(manifest_path), output_path, owner="a")
+    second = BatchRunner(WorkManifest(manifest_path), output_path, owner="b")
+    first_batch = next(first.batches(5))
+    second_batch = next(second.batches(5))
+    assert not set(first_batch) & set(second_batch)
+    for item_id, payload in first_batch.items():
+        assert first.commit(item_id, payload["value"] * 2)
+
+    # The remaining items are processed one by one, a failing item is retried up to max_attempts times
+    remaining = set(str(i) for i in range(20)) - set(first_batch) - set(second_batch)
+    odd = {item_id for item_id in remaining if int(item_id) % 2}
+    assert second.run(lambda item_id, payload: 1 / (payload["value"] % 2)) == len(odd)
+    for item_id in second_batch:
+        assert second.commit(item_id, None)
+    assert not first.commit(next(iter(second_batch)), None)
+    assert manifest.counts() == {"done": 10 + len(odd), "failed": 10 - len(odd)}
+
+    results = PackedDataset(output_path)
+    assert len(results) == 10 + len(odd)
+    assert all(results[item_id] == int(item_id) * 2 for item_id in first_batch)
+
+
+def test_shards_and_stale_claims(tmp_path):
+    manifest = WorkManifest(str(tmp_path / "manifest.sqlite"), stale_after=0.0)
+    manifest.add((str(i), i) for i in range(100))
+    shards = [{item_id for item_id, _ in manifest.claim(f"shard{i}", (i, 3), 100)} for i in range(3)]
+    assert sum(len(shard) for shard in shards) == 100
+    assert not shards[0] & shards[1] and 20 < len(shards[0]) < 50
+    # Claims older than stale_after can be taken over
+    assert len(manifest.claim("other", (0, 3), 100)) == len(shards[0])
+
+    assert parse_shard("1/4") == (1, 4)
+    with pytest.raises(ValueError):
+        parse_shard("4/4")
+
+
+def test_batch_executor_commits_from_its_workers(tmp_path):
+    manifest = WorkManifest(str(tmp_path / "manifest.sqlite"))
+    manifest.add((str(i), [{"task": "Lightpath", "description": f"l{i}"}] * 3) for i in range(6))
+    runner = BatchRunner(manifest, str(tmp_path / "output.jsonl"))
+    executors = [Executor(FakeLLMInterface(name_command), "", {"Lightpath": "lp"}, {"Lightpath": "lp_grammar"}) for _ in range(3)]
+    for task_lists in runner.batches(4):
+        BatchExecutor(executors).run(task_lists, on_complete=runner.commit)
+    assert manifest.counts() == {"done": 6}
+    results = PackedDataset(runner.output_path)
+    assert [command["name"] for command in results["5"]] == ["l5"] * 3
+
+
+def test_interrupted_runs_resume(tmp_path):
+    manifest = WorkManifest(str(tmp_path / "manifest.sqlite"))
+    manifest.add((str(i), i) for i in range(4))
+    runner = BatchRunner(manifest, str(tmp_path / "output.jsonl"))
+
+    def interrupt(item_id, payload):
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        runner.run(interrupt)
+    assert manifest.counts() == {"pending": 4}
+    assert runner.run(lambda item_id, payload: payload) == 4
+
+    # A task list whose task fails is recorded as failed, the others are committed
+    manifest = WorkManifest(str(tmp_path / "execution.sqlite"), max_attempts=1)
+    manifest.add([("1", [{"task": "Lightpath", "description": "l1"}]), ("2", [{"task": "Unknown"}])])
+    runner = BatchRunner(manifest, str(tmp_path / "json_data.jsonl"))
+    executors = [Executor(FakeLLMInterface(name_command), "", {"Lightpath": "lp"}, {"Lightpath": "lp_grammar"}) for _ in range(2)]
+    for task_lists in runner.batches(2):
+        BatchExecutor(executors).run(task_lists, on_complete=runner.commit, on_error=runner.fail)
+    assert manifest.counts() == {"done": 1, "failed": 1}
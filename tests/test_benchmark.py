@@ -0,0 +1,30 @@
+import json
+import os
+
+from llm_orchestrator.benchmark import run_benchmark
+from llm_orchestrator.fake_llm import FakeLLMInterface, ReplayResponder
+
+
+def test_replay_responder(tmp_path):
+    recording_path = tmp_path / "recording.jsonl"
+    recording_path.write_text(json.dumps({"prompt": "[INST]Hi[/INST]", "completion": '{"a": 1}'}) + "\n")
+    interface = FakeLLMInterface(ReplayResponder(str(recording_path)))
+    tokens = interface.tokenize("[INST]Hi[/INST]")
+    assert interface.generate(tokens)["choices"][0]["text"] == '{"a": 1}'
+    streamed = "".join(chunk["choices"][0]["text"] for chunk in interface.generate(tokens, stream=True))
+    assert streamed == '{"a": 1}'
+
+
+def test_run_benchmark():
+    data = os.path.join(".", "data")
+    results = run_benchmark(
+        os.path.join(data, "test_set"),
+        os.path.join(data, "json_schemas"),
+        os.path.join(data, "topology.json"),
+        os.path.join(data, "system_prompts"),
+        limit=5,
+    )
+    assert results["intents"] == 5
+    assert set(results["stages"]) == {"planning", "execution", "verification", "evaluation", "pipeline"}
+    assert results["stages"]["pipeline"]["count"] == 5
+    assert results["command_exact_match_rate"] > 0
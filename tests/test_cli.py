@@ -0,0 +1,36 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+from llm_orchestrator.cli import main
+
+
+def test_verify_exit_code(tmp_path, capsys):
+    with open("data/test_set/ground_truths/answer_1.json") as f:
+        commands = json.load(f)
+    valid_path = tmp_path / "valid.json"
+    valid_path.write_text(json.dumps(commands))
+    with pytest.raises(SystemExit) as exit_info:
+        main(["verify", str(valid_path)])
+    assert exit_info.value.code == 0
+    assert capsys.readouterr().out.count(": valid") == len(commands)
+
+    invalid_path = tmp_path / "invalid.json"
+    invalid_path.write_text(json.dumps(dict(commands[0], routingCriteria=1)))
+    with pytest.raises(SystemExit) as exit_info:
+        main(["verify", "--quiet", str(valid_path), str(invalid_path)])
+    assert exit_info.value.code == 1
+    assert capsys.readouterr().out.startswith(f"{invalid_path}: ")
+
+
+def test_verify_and_evaluate_do_not_load_inference_modules():
+    code = (
+        "import sys\n"
+        "import llm_orchestrator.commands.evaluate, llm_orchestrator.commands.verify\n"
+        "print(sorted(m for m in sys.modules if m.split('.')[0] in ('llama_cpp', 'tqdm')"
+        " or m in ('llm_orchestrator.llm_interface', 'llm_orchestrator.grammar_cache')))"
+    )
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert output.strip() == "[]"
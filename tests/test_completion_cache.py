@@ -0,0 +1,35 @@
+from llm_orchestrator.completion_cache import CompletionCache
+
+
+def test_hit_and_miss(tmp_path):
+    cache = CompletionCache(str(tmp_path / "completions.sqlite"))
+    key = CompletionCache.make_key(["model.gguf", 1], [1, 2, 3], "root ::= x", {"seed": 42})
+    assert key == CompletionCache.make_key(["model.gguf", 1], [1, 2, 3], "root ::= x", {"seed": 42})
+    assert key != CompletionCache.make_key(["model.gguf", 1], [1, 2, 3], "root ::= y", {"seed": 42})
+    assert cache.get(key) is None
+    cache.put(key, {"choices": [{"text": "{}"}]})
+    assert cache.get(key) == {"choices": [{"text": "{}"}]}
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Entries survive a reopen
+    cache.close()
+    assert CompletionCache(str(tmp_path / "completions.sqlite")).get(key) is not None
+
+
+def test_lru_eviction(tmp_path):
+    cache = CompletionCache(str(tmp_path / "completions.sqlite"), max_bytes=100)
+    for key in ["a", "b", "c"]:
+        cache.put(key, "x" * 30)
+    cache.get("a")
+    cache.put("d", "x" * 30)
+    assert len(cache) == 3
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+
+
+def test_rollback_journal_by_default(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    CompletionCache(path, journal_mode="WAL").close()
+    # A cache left in WAL mode is switched back, WAL does not work on shared network storage
+    cache = CompletionCache(path)
+    assert cache._connection.execute("PRAGMA journal_mode").fetchone() == ("delete",)
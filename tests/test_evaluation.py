@@ -0,0 +1,67 @@
+import json
+import shutil
+
+from llm_orchestrator.evaluation import Evaluator, pair_files, pair_results
+
+
+def test_evaluation_report(tmp_path):
+    predictions = tmp_path / "predictions"
+    predictions.mkdir()
+    ground_truth = json.load(open("data/test_set/ground_truths/answer_1.json"))
+    ground_truth[0]["protection"] = True
+    with open(predictions / "prediction_1.json", "w") as f:
+        json.dump(ground_truth, f)
+    shutil.copy("data/test_set/ground_truths/answer_2.json", predictions / "prediction_2.json")
+
+    evaluator = Evaluator("data/json_schemas", n_workers=2)
+    pairs = pair_files(str(predictions), "data/test_set/ground_truths")
+    records = evaluator.evaluate(pairs)
+    assert len(records) == 50
+    assert not records[0]["exact_match"] and records[0]["valid"]
+    assert records[0]["commands"][0]["fields"]["protection"] is False
+    assert records[0]["commands"][1]["exact_match"]
+    assert records[1]["exact_match"]
+    assert records[2]["missing"]
+
+    summary = evaluator.summarize(records)
+    assert summary["missing"] == 48
+    assert summary["field_accuracy"]["name"] == 1.0
+    assert summary["field_accuracy"]["protection"] < 1.0
+
+    report_path = str(tmp_path / "report.jsonl")
+    evaluator.write_report(records, summary, report_path)
+    assert len(open(report_path).readlines()) == 50
+    assert json.load(open(tmp_path / "report_summary.json")) == summary
+    assert (tmp_path / "report_commands.csv").exists()
+
+
+def test_evaluate_jsonl_results(tmp_path):
+    results_path = tmp_path / "json_data.jsonl"
+    ground_truth = json.load(open("data/test_set/ground_truths/answer_3.json"))
+    results_path.write_text(json.dumps({"id": "3", "result": ground_truth}) + "\n")
+
+    evaluator = Evaluator("data/json_schemas", n_workers=1)
+    records = evaluator.evaluate(pair_results(str(results_path), "data/test_set/ground_truths"))
+    assert records[2]["id"] == "3" and records[2]["exact_match"]
+    summary = evaluator.summarize(records)
+    assert summary["missing"] == 49
+    # The service rates share a schema but are separate task types
+    assert {task_type: rates["commands"] for task_type, rates in summary["task_types"].items()} == {
+        "Service-10Gb": 1,
+        "Service-1Gb": 2,
+    }
+
+
+def test_packed_ground_truths_with_named_ids(tmp_path):
+    ground_truth = json.load(open("data/test_set/ground_truths/answer_3.json"))
+    ground_truths_path = tmp_path / "ground_truths.jsonl"
+    ground_truths_path.write_text(
+        "".join(json.dumps({"id": pair_id, "result": ground_truth}) + "\n" for pair_id in ["extra", "10", "3"])
+    )
+    results_path = tmp_path / "json_data.jsonl"
+    results_path.write_text(json.dumps({"id": "extra", "result": ground_truth}) + "\n")
+
+    pairs = pair_results(str(results_path), str(ground_truths_path))
+    assert [pair[0] for pair in pairs] == ["3", "10", "extra"]
+    records = Evaluator("data/json_schemas", n_workers=1).evaluate(pairs)
+    assert records[2]["exact_match"] and records[0]["missing"]
@@ -0,0 +1,32 @@
+import json
+
+from llm_orchestrator.executor import BatchExecutor, Executor
+from llm_orchestrator.fake_llm import FakeLLMInterface
+
+
+def name_command(prompt):
+    # The command is named after the task description, found after the empty system prompt
+    return json.dumps({"name": prompt.split("]", 1)[1].split("\n")[0]})
+
+
+def test_batch_execution_keeps_order():
+    task_to_schema = {"Lightpath": "lp", "Measurement": "ms"}
+    grammars = {"Lightpath": "lp_grammar", "Measurement": "ms_grammar"}
+    executors = [Executor(FakeLLMInterface(name_command), "", task_to_schema, grammars) for _ in range(3)]
+    task_lists = {
+        "1": [{"task": "Measurement", "description": "m1"}, {"task": "Lightpath", "description": "l1"}],
+        "2": [{"task": "Lightpath", "description": "l2"}, {"task": "Measurement", "description": "m2"}],
+        "3": [],
+    }
+    completed = {}
+    results = BatchExecutor(executors).run(task_lists, on_complete=completed.__setitem__)
+
+    assert [command["name"] for command in results["1"]] == ["m1", "l1"]
+    assert [command["name"] for command in results["2"]] == ["l2", "m2"]
+    grammars = {
+        json.loads(name_command(call["prompt"]))["name"]: call["grammar"]
+        for executor in executors
+        for call in executor.interface.calls
+    }
+    assert grammars["l1"] == "lp_grammar" and grammars["m2"] == "ms_grammar"
+    assert completed == results
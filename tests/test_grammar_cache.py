@@ -0,0 +1,12 @@
+import os
+
+from llm_orchestrator.grammar_cache import GrammarCache
+
+
+def test_gbnf_read_from_disk(tmp_path):
+    schema = open("data/json_schemas/measurement_schema.json").read()
+    cache = GrammarCache(str(tmp_path))
+    with open(os.path.join(tmp_path, f"{cache._key(schema)}.gbnf"), "w") as f:
+        f.write('root ::= "{}"')
+    assert cache.gbnf(schema) == 'root ::= "{}"'
+    assert cache._key(schema) != cache._key(schema + " ")
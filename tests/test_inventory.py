@@ -0,0 +1,32 @@
+import pytest
+
+from llm_orchestrator.inventory import Inventory
+
+
+def test_allocate_and_release():
+    inventory = Inventory.from_file("data/topology.json")
+    assert inventory.allocate("Node1", "Lightpath", owner="a") == 2269
+    assert inventory.allocate("Node1", "Lightpath", owner="b") == 2270
+    assert inventory.free_count("Node1", "Lightpath") == 6
+    assert inventory.release_owner("a") == [2269]
+    assert not inventory.is_allocated(2269)
+    assert inventory.allocate("Node1", "Lightpath") == 2269
+
+    inventory = Inventory({"Node1": {"Lightpath": [1]}})
+    inventory.allocate("Node1", "Lightpath")
+    with pytest.raises(LookupError):
+        inventory.allocate("Node1", "Lightpath")
+
+
+def test_allocations_persist(tmp_path):
+    state_path = str(tmp_path / "allocations.jsonl")
+    inventory = Inventory.from_file("data/topology.json", state_path=state_path)
+    first = inventory.allocate("Node2", "Service-1Gb", owner="a")
+    second = inventory.allocate("Node2", "Service-1Gb", owner="b")
+    inventory.release(first)
+    inventory.close()
+
+    inventory = Inventory.from_file("data/topology.json", state_path=state_path)
+    assert not inventory.is_allocated(first)
+    assert inventory.owner(second) == "b"
+    assert inventory.allocate("Node2", "Service-1Gb") == first
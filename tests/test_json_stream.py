@@ -0,0 +1,27 @@
+import json
+
+import pytest
+
+from llm_orchestrator.json_stream import JSONArrayStreamParser
+
+
+def test_elements_are_returned_when_complete():
+    data = [{"task": "Lightpath", "description": 'a "quoted" [text]}'}, [1, [2]], "x", 3, True, None]
+    text = json.dumps(data, indent=2)
+    parser = JSONArrayStreamParser()
+    elements = []
+    for i in range(0, len(text), 3):
+        elements += parser.feed(text[i : i + 3])
+    parser.close()
+    assert elements == data
+
+    parser = JSONArrayStreamParser()
+    assert parser.feed('[{"a": 1}, {"b"') == [{"a": 1}]
+    assert parser.feed(": 2}") == [{"b": 2}]
+
+
+def test_incomplete_array():
+    parser = JSONArrayStreamParser()
+    parser.feed('[{"a": 1}')
+    with pytest.raises(json.JSONDecodeError):
+        parser.close()
@@ -0,0 +1,66 @@
+import json
+import re
+
+from llm_orchestrator.grammar_cache import GrammarCache
+from llm_orchestrator.jump_forward import JumpForwardDecoder
+from llm_orchestrator.llm_interface import AbstractLLMInterface
+
+LITERAL_PATTERN = re.compile(r'"(?:[^"\\]|\\.)*"')
+
+
+class TextGrammarCache(GrammarCache):
+    def from_gbnf(self, gbnf):
+        return gbnf
+
+    def from_json_schema(self, schema):
+        return schema
+
+
+class OracleInterface(AbstractLLMInterface):
+    # Continues the prompt with the target output, within the alternatives of choice grammars and
+    # at most 4 characters per token
+    def __init__(self, prompt, target):
+        self.prompt = prompt
+        self.target = target
+        self.calls = 0
+
+    def tokenize(self, prompt):
+        return prompt
+
+    def generate(self, tokens, max_tokens=0, grammar=None, **kwargs):
+        self.calls += 1
+        continuation = self.target[len(tokens) - len(self.prompt) :]
+        if max_tokens == 1:
+            remainders = [json.loads(literal) for literal in LITERAL_PATTERN.findall(grammar[len("root ::= ") :])]
+            remainder = next(remainder for remainder in remainders if continuation.startswith(remainder))
+            continuation = remainder[:4]
+        return {"choices": [{"text": continuation}]}
+
+
+def layout(value, schema):
+    # Required properties first, as in the grammar
+    if isinstance(value, dict):
+        properties = schema.get("properties", {})
+        required = schema.get("required", [])
+        keys = [key for key in properties if key in required] + [key for key in properties if key not in required]
+        return {key: layout(value[key], properties[key]) for key in keys if key in value}
+    if isinstance(value, list):
+        return [layout(item, schema.get("items", {})) for item in value]
+    return value
+
+
+def test_decode_lightpath():
+    schema = json.load(open("data/json_schemas/lightpath_schema.json"))
+    command = json.load(open("data/test_set/ground_truths/answer_1.json"))[0]
+    # endType is outside of the item properties in the schema, so the grammar cannot produce it
+    for end_point in command["connEndPoints"]:
+        del end_point["endType"]
+    target = json.dumps(layout(command, schema))
+
+    interface = OracleInterface("[INST]prompt[/INST]", target)
+    decoder = JumpForwardDecoder(interface, schema, TextGrammarCache())
+    text = decoder.decode(interface.prompt, seed=42)
+    assert text == target
+    assert json.loads(text) == command
+    assert decoder.forced_characters > 3 * decoder.sampled_characters
+    assert decoder.samples == interface.calls
@@ -0,0 +1,80 @@
+import os
+import sys
+import types
+
+import pytest
+
+from llm_orchestrator.llm_interface import LLMInterface
+
+
+class FakeLlama:
+    # Keeps the evaluated tokens like the llama.cpp KV cache, and counts prefills and state loads
+    def __init__(self, model_path, **kwargs):
+        self._input_ids = []
+        self.evaluated = []
+        self.loaded_states = 0
+
+    def tokenize(self, text):
+        return list(text)
+
+    def n_ctx(self):
+        return 512
+
+    def reset(self):
+        self._input_ids = []
+
+    def eval(self, tokens):
+        self.evaluated.append(list(tokens))
+        self._input_ids += list(tokens)
+
+    def save_state(self):
+        return {"input_ids": list(self._input_ids)}
+
+    def load_state(self, state):
+        self.loaded_states += 1
+        self._input_ids = list(state["input_ids"])
+
+    def create_completion(self, tokens, **kwargs):
+        self._input_ids = list(tokens)
+        return {"choices": [{"text": "ok", "index": 0, "finish_reason": "stop"}]}
+
+
+@pytest.fixture
+def model_path(tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, "llama_cpp", types.SimpleNamespace(Llama=FakeLlama))
+    path = tmp_path / "model.gguf"
+    path.write_bytes(b"weights")
+    return str(path)
+
+
+def test_prefix_state_is_restored_only_when_the_cache_diverged(model_path, tmp_path):
+    cache_dir = str(tmp_path / "prefixes")
+    interface = LLMInterface(model_path, prefix_cache_dir=cache_dir)
+    prefix = interface.set_prefix("[INST]system")
+    assert interface.llm.evaluated == [prefix]
+    assert len(os.listdir(cache_dir)) == 1
+
+    # The KV cache still starts with the prefix: llama.cpp reuses it, the state is not loaded
+    interface.generate(interface.tokenize("[INST]system question 1"))
+    interface.generate(interface.tokenize("[INST]system question 2"))
+    assert interface.llm.loaded_states == 0
+    # A prompt without the prefix needs no restore, and leaves the cache diverged for the next one
+    interface.generate(interface.tokenize("other prompt"))
+    assert interface.llm.loaded_states == 0
+    interface.generate(interface.tokenize("[INST]system question 3"))
+    assert interface.llm.loaded_states == 1
+
+
+def test_prefix_state_round_trips_through_disk(model_path, tmp_path):
+    cache_dir = str(tmp_path / "prefixes")
+    LLMInterface(model_path, prefix_cache_dir=cache_dir).set_prefix("[INST]system")
+
+    # A later run loads the saved state instead of evaluating the prefix again
+    interface = LLMInterface(model_path, prefix_cache_dir=cache_dir)
+    prefix = interface.set_prefix("[INST]system")
+    assert interface.llm.evaluated == []
+    assert interface.llm.loaded_states == 1
+    assert interface.llm._input_ids == prefix
+    # Another prefix is another entry
+    LLMInterface(model_path, prefix_cache_dir=cache_dir).set_prefix("[INST]other system")
+    assert len(os.listdir(cache_dir)) == 2
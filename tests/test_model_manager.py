@@ -0,0 +1,130 @@
+import threading
+
+import pytest
+
+from llm_orchestrator.fake_llm import FakeLLMInterface
+from llm_orchestrator.model_manager import ModelManager
+
+
+class ClosingFakeLLMInterface(FakeLLMInterface):
+    def __init__(self, model_path, role, **kwargs):
+        super().__init__(lambda prompt: f"{role}:{prompt}")
+        self.kwargs = kwargs
+        self.prefixes = []
+        self.closed = False
+
+    def set_prefix(self, prefix):
+        self.prefixes.append(prefix)
+        return super().set_prefix(prefix)
+
+    def close(self):
+        self.closed = True
+
+
+def make_manager(ram_budget):
+    loads = []
+
+    def factory(model_path, role, **kwargs):
+        loads.append(ClosingFakeLLMInterface(model_path, role, **kwargs))
+        return loads[-1]
+
+    return ModelManager(ram_budget=ram_budget, factory=factory), loads
+
+
+def test_models_are_loaded_lazily_with_their_settings():
+    manager, loads = make_manager(None)
+    planner = manager.register("planner", "planner.gguf", memory=10, n_ctx=4096, n_threads=8)
+    manager.register("executor", "executor.gguf", memory=5, n_ctx=2048)
+    planner.set_prefix("[INST]system")
+    assert loads == []
+
+    output = planner.generate(planner.tokenize("[INST]system question"))
+    assert output["choices"][0]["text"] == "planner:[INST]system question"
+    assert len(loads) == 1
+    assert loads[0].kwargs == {"n_ctx": 4096, "n_threads": 8}
+    assert loads[0].prefixes == ["[INST]system"]
+    assert not manager.is_loaded("executor")
+
+
+def test_least_recently_used_idle_model_is_evicted():
+    manager, loads = make_manager(20)
+    planner = manager.register("planner", "planner.gguf", memory=10)
+    executor = manager.register("executor", "executor.gguf", memory=10)
+    verifier = manager.register("verifier", "verifier.gguf", memory=10)
+    planner.tokenize("a")
+    executor.tokenize("b")
+    planner.tokenize("c")
+    verifier.tokenize("d")
+    assert manager.is_loaded("planner") and manager.is_loaded("verifier")
+    assert not manager.is_loaded("executor")
+    assert loads[1].closed
+
+    # The evicted model is loaded again, with its prefix
+    executor.set_prefix("[INST]executor")
+    executor.tokenize("e")
+    assert len(loads) == 4
+    assert loads[3].prefixes == ["[INST]executor"]
+    manager.close()
+    assert all(interface.closed for interface in loads)
+
+
+def test_streaming_model_is_not_evicted():
+    manager, loads = make_manager(10)
+    planner = manager.register("planner", "planner.gguf", memory=10)
+    executor = manager.register("executor", "executor.gguf", memory=10)
+    stream = planner.stream(planner.tokenize("question"))
+    first = next(stream)
+
+    executed = []
+    thread = threading.Thread(target=lambda: executed.append(executor.tokenize("task")))
+    thread.start()
+    thread.join(0.1)
+    # The executor waits for the planner stream to end
+    assert thread.is_alive() and not loads[0].closed
+    rest = "".join(stream)
+    thread.join(5)
+    assert first + rest == "planner:question"
+    assert executed and loads[0].closed
+
+
+def test_own_models_do_not_deadlock():
+    manager, _ = make_manager(10)
+    planner = manager.register("planner", "planner.gguf", memory=10)
+    executor = manager.register("executor", "executor.gguf", memory=10)
+    stream = planner.stream(planner.tokenize("question"))
+    next(stream)
+    with pytest.warns(UserWarning):
+        executor.tokenize("task")
+    assert manager.loaded_memory() == 20
+
+
+def test_other_models_are_usable_while_one_loads():
+    loading = threading.Event()
+    proceed = threading.Event()
+    manager, loads = make_manager(None)
+    inner_factory = manager.factory
+
+    def slow_factory(model_path, role, **kwargs):
+        if role == "executor":
+            loading.set()
+            proceed.wait(5)
+        return inner_factory(model_path, role, **kwargs)
+
+    manager.factory = slow_factory
+    planner = manager.register("planner", "planner.gguf", memory=10)
+    executor = manager.register("executor", "executor.gguf", memory=10)
+    planner.tokenize("warm up")
+    thread = threading.Thread(target=lambda: executor.tokenize("task"))
+    thread.start()
+    assert loading.wait(5)
+    # The planner is used while the executor loads
+    outputs = []
+    planning = threading.Thread(target=lambda: outputs.append(planner.generate(planner.tokenize("question"))))
+    planning.start()
+    planning.join(1)
+    finished_during_load = not planning.is_alive()
+    proceed.set()
+    planning.join(5)
+    assert finished_during_load and outputs[0]["choices"][0]["text"] == "planner:question"
+    thread.join(5)
+    assert manager.is_loaded("executor") and len(loads) == 2
@@ -0,0 +1,68 @@
+import json
+import os
+
+import pytest
+
+from llm_orchestrator.evaluation import Evaluator, pair_results
+from llm_orchestrator.packed_dataset import PackedDataset, iter_folder, pack_folder, read_dataset, unpack
+
+
+def test_records_are_indexed_and_replaced(tmp_path):
+    path = str(tmp_path / "records.jsonl")
+    with pytest.raises(FileNotFoundError):
+        PackedDataset(path)
+    with pytest.raises(FileNotFoundError):
+        read_dataset(path)
+    dataset = PackedDataset(path, create=True)
+    dataset.append("1", {"a": 1})
+    dataset.extend([("2", "text"), ("1", {"a": 2})])
+    assert len(dataset) == 2
+    assert dataset["1"] == {"a": 2}
+    assert list(dataset) == [("2", "text"), ("1", {"a": 2})]
+    dataset.close()
+
+    # Lines appended by another writer are indexed when the dataset is opened again
+    with open(path, "a") as f:
+        f.write(json.dumps({"id": "3", "result": [3]}) + "\n")
+        f.write('{"id": "4", "res')
+    reopened = PackedDataset(path)
+    assert reopened["3"] == [3] and "4" not in reopened
+    assert len(open(reopened.index_path).readlines()) == 4
+
+
+def test_pack_and_unpack_folder(tmp_path):
+    path = str(tmp_path / "ground_truths.jsonl")
+    assert pack_folder("data/test_set/ground_truths", path) == len(list(iter_folder("data/test_set/ground_truths")))
+    with open("data/test_set/ground_truths/answer_7.json") as f:
+        assert PackedDataset(path)["7"] == json.load(f)
+
+    assert unpack(path, str(tmp_path / "unpacked"), "answer_{}.json") == len(PackedDataset(path))
+    assert list(read_dataset(str(tmp_path / "unpacked"))) == list(read_dataset(path))
+
+
+def test_evaluate_packed_ground_truths(tmp_path):
+    ground_truths_path = str(tmp_path / "ground_truths.jsonl")
+    pack_folder("data/test_set/ground_truths", ground_truths_path)
+    results_path = str(tmp_path / "json_data.jsonl")
+    PackedDataset(results_path, create=True).append("1", PackedDataset(ground_truths_path)["1"])
+
+    records = Evaluator("data/json_schemas", n_workers=1).evaluate(pair_results(results_path, ground_truths_path))
+    assert records[0]["id"] == "1" and records[0]["exact_match"]
+    assert all(record["missing"] for record in records[1:])
+
+
+def test_index_of_a_rewritten_file_is_rebuilt(tmp_path):
+    path = str(tmp_path / "records.jsonl")
+    PackedDataset(path, create=True).extend([("1", "a"), ("2", "b")])
+    os.remove(path)
+    # Written again by another process, larger: the index left over does not match the file anymore
+    with open(path, "w") as f:
+        f.writelines(json.dumps({"id": record_id, "result": record}) + "\n" for record_id, record in ["3c", "4d", "5e"])
+    dataset = PackedDataset(path)
+    assert list(dataset) == [("3", "c"), ("4", "d"), ("5", "e")]
+    assert "1" not in dataset
+
+    with open(path, "w") as f:
+        f.write(json.dumps({"id": "6", "result": "fff"}) + "\n")
+    dataset.refresh()
+    assert list(dataset) == [("6", "fff")]
@@ -0,0 +1,45 @@
+import json
+
+from llm_orchestrator.fake_llm import FakeLLMInterface
+from llm_orchestrator.inventory import Inventory
+from llm_orchestrator.planner import Planner
+
+TOPOLOGY = {
+    "Node1": {"Lightpath": [2269]},
+    "Node2": {"Lightpath": [2297]},
+}
+TASKS = [
+    {"task": "Lightpath", "source": "Node1", "sink": "Node2", "description": "Lightpath Node1-Node2."},
+    {"task": "Measurement", "source": "", "sink": "", "description": "Monitor LP-Node1-Node2."},
+]
+
+
+def test_single_constrained_generation():
+    interface = FakeLLMInterface(lambda prompt: json.dumps(TASKS))
+    inventory = Inventory(TOPOLOGY)
+    planner = Planner(interface, "system prompt", grammar="grammar", inventory=inventory)
+    tasks = planner.plan("Create a lightpath between Node1 and Node2", owner="request-1")
+
+    assert len(interface.calls) == 1
+    assert interface.calls[0]["grammar"] == "grammar"
+    assert tasks[0]["description"].endswith("ID of the source interface: 2269, ID of the sink interface: 2297")
+    assert tasks[1]["description"] == TASKS[1]["description"]
+    assert set(planner.timer.last) == {"tokenize", "prefill", "decode", "parse", "id_assignment"}
+    assert inventory.owner(2269) == "request-1" and inventory.owner(2297) == "request-1"
+
+
+def test_tasks_are_streamed_before_generation_ends():
+    interface = FakeLLMInterface(lambda prompt: json.dumps(TASKS))
+    planner = Planner(interface, "system prompt", grammar="grammar", inventory=Inventory(TOPOLOGY))
+    output = planner.generate_task_list
+    consumed = []
+
+    def generate_task_list(question):
+        for text in output(question):
+            consumed.append(text)
+            yield text
+
+    planner.generate_task_list = generate_task_list
+    first_task = next(planner.plan_stream("Create a lightpath between Node1 and Node2"))
+    assert first_task["task"] == "Lightpath"
+    assert len("".join(consumed)) < len(json.dumps(TASKS))
@@ -0,0 +1,43 @@
+import json
+import os
+import shutil
+
+from llm_orchestrator.schema_registry import SchemaRegistry
+from llm_orchestrator.verifier import Verifier
+
+
+def test_routing():
+    registry = SchemaRegistry(schema_dir="data/json_schemas")
+    lightpath = {"className": "Connection", "hierarchicalLevel": "infrastructure"}
+    service = {"className": "Connection", "hierarchicalLevel": "service"}
+    measurement = {"configurationState": "started", "transports": {"name": "Node1-to-Node2"}}
+    assert [e.file_name for e in registry.route(lightpath)][:2] == ["lightpath_schema.json", "measurement_schema.json"]
+    assert "service_schema.json" not in [e.file_name for e in registry.route(lightpath)]
+    assert [e.file_name for e in registry.route(service)][:2] == ["service_schema.json", "measurement_schema.json"]
+    assert registry.route(measurement)[0].file_name == "measurement_schema.json"
+    assert [e.file_name for e in registry.route([])] == ["task_schema.json"]
+
+    # configurationState is optional in a measurement, a document without any discriminator keeps every schema
+    measurement = {"pm": {"cd15m": "enabledOnlyCurrent"}, "transports": {"name": "LP-Node1-Node2"}}
+    assert len(registry.route(measurement)) == len(registry.entries())
+    verifier = Verifier(schema_dir="data/json_schemas")
+    assert verifier.verify(measurement)[0] and verifier.verify({})[0]
+    assert verifier.schema_name(measurement) == "measurement_schema.json"
+
+
+def test_reload_on_mtime_change(tmp_path):
+    shutil.copy("data/json_schemas/measurement_schema.json", tmp_path)
+    registry = SchemaRegistry(schema_dir=str(tmp_path))
+    entry = registry.get("measurement_schema.json")
+    registry.refresh()
+    assert registry.get("measurement_schema.json") is entry
+
+    path = os.path.join(tmp_path, "measurement_schema.json")
+    schema = json.load(open(path))
+    schema["required"] = ["transports"]
+    with open(path, "w") as f:
+        json.dump(schema, f)
+    os.utime(path, (entry.mtime + 10, entry.mtime + 10))
+    registry.refresh()
+    assert registry.get("measurement_schema.json") is not entry
+    assert registry.get("measurement_schema.json").schema["required"] == ["transports"]
@@ -0,0 +1,28 @@
+from llm_orchestrator.schema_renderer import SchemaRenderer
+
+
+def test_render_schema():
+    schema = {
+        "$schema": "https://json-schema.org/draft/2020-12/schema",
+        "type": "object",
+        "properties": {
+            "className": {"type": "string", "enum": ["Connection"], "default": "", "description": "Class"},
+            "tag": {"type": "string", "description": "tag", "default": ""},
+            "rate": {"type": "string", "enum": ["1Gb", "10Gb"], "description": "Connection rate"},
+            "connLps": {"type": "array", "items": {"type": "object", "properties": {"id": {"type": "integer"}}}},
+        },
+        "required": ["className", "rate"],
+    }
+    renderer = SchemaRenderer()
+    assert renderer.render(schema) == (
+        '{className:"Connection",tag?:string="",rate:"1Gb"|"10Gb" (Connection rate),connLps?:[{id:integer}]}'
+    )
+    assert SchemaRenderer(descriptions=False).render(schema).count("(") == 0
+
+
+def test_rendering_is_shorter():
+    renderer = SchemaRenderer()
+    schema = open("data/json_schemas/service_schema.json").read()
+    raw_tokens, rendered_tokens = renderer.token_counts(schema, str.split)
+    assert rendered_tokens < raw_tokens
+    assert renderer.render(schema) is renderer.render(schema)
@@ -0,0 +1,90 @@
+import asyncio
+import json
+
+from llm_orchestrator.inventory import Inventory
+from llm_orchestrator.service import Orchestrator, OrchestratorServer
+from llm_orchestrator.verifier import Verifier
+
+MEASUREMENT = {"configurationState": "started", "transports": {"name": "LP-Node1-Node2"}}
+
+
+class FakePlanner:
+    def plan_stream(self, question, owner):
+        yield from [{"task": "Measurement", "description": question}, {"task": "Measurement", "description": "bad"}]
+
+
+class FakeExecutor:
+    def execute(self, task):
+        if task["description"] == "bad":
+            return {"name": "John", "configurationState": "stopped"}
+        return MEASUREMENT
+
+
+class AllocatingPlanner:
+    def __init__(self, inventory):
+        self.inventory = inventory
+
+    def plan_stream(self, question, owner):
+        self.inventory.allocate("Node1", "Measurement", owner)
+        yield {"task": "Measurement", "description": question}
+        if question == "fail":
+            self.inventory.allocate("Node2", "Measurement", owner)
+
+
+async def query(path, question, request=None):
+    reader, writer = await asyncio.open_unix_connection(path)
+    writer.write(json.dumps(request or {"question": question}).encode("utf-8") + b"\n")
+    await writer.drain()
+    messages = []
+    while not messages or "done" not in messages[-1]:
+        messages.append(json.loads(await reader.readline()))
+    writer.close()
+    return messages
+
+
+def test_server_streams_verified_commands(tmp_path):
+    orchestrator = Orchestrator(FakePlanner(), FakeExecutor(), Verifier(schema_dir="data/json_schemas"))
+    path = str(tmp_path / "orchestrator.sock")
+
+    async def scenario():
+        server = OrchestratorServer(orchestrator)
+        listener = await server.start(unix_socket=path)
+        async with listener:
+            results = await asyncio.gather(query(path, "monitor"), query(path, "monitor again"))
+        await server.stop()
+        return results
+
+    results = asyncio.run(scenario())
+    orchestrator.close()
+    for messages in results:
+        assert len(messages) == 3
+        assert messages[0]["valid"] and messages[0]["command"] == MEASUREMENT
+        assert not messages[1]["valid"] and messages[1]["errors"]
+        assert messages[2]["done"] and messages[2]["owner"]
+
+
+def test_failed_requests_release_their_interfaces(tmp_path):
+    inventory = Inventory({"Node1": {"Measurement": [1, 2]}, "Node2": {"Measurement": []}})
+    orchestrator = Orchestrator(
+        AllocatingPlanner(inventory), FakeExecutor(), Verifier(schema_dir="data/json_schemas"), inventory
+    )
+    path = str(tmp_path / "orchestrator.sock")
+
+    async def scenario():
+        server = OrchestratorServer(orchestrator)
+        listener = await server.start(unix_socket=path)
+        async with listener:
+            failed = await query(path, "fail", {"question": "fail", "owner": "a"})
+            done = await query(path, "monitor", {"question": "monitor", "owner": "b"})
+            released = await query(path, None, {"release": "b"})
+        await server.stop()
+        return failed, done, released
+
+    failed, done, released = asyncio.run(scenario())
+    orchestrator.close()
+    # The planner ran out of Node2 interfaces after allocating one on Node1
+    assert "LookupError" in failed[-2]["error"]
+    assert inventory.owner(1) is None
+    assert done[-1] == {"done": True, "owner": "b"}
+    assert released[0] == {"released": [1]}
+    assert inventory.free_count("Node1", "Measurement") == 2
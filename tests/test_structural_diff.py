@@ -0,0 +1,41 @@
+import json
+
+from llm_orchestrator.structural_diff import structural_diff
+
+
+def test_array_elements_are_matched_by_key():
+    schema = json.load(open("data/json_schemas/lightpath_schema.json"))
+    ground_truth = json.load(open("data/test_set/ground_truths/answer_1.json"))[0]
+    data = json.loads(json.dumps(ground_truth))
+    data["connEndPoints"].reverse()
+    data["connEndPoints"][0]["ltp"]["id"] = 1
+    del data["protection"]
+    data["routingCriteria"] = "byHops"
+    data["extra"] = True
+
+    differences = structural_diff(data, ground_truth, schema)
+    assert [(d["path"], d["field"], d["kind"]) for d in differences] == [
+        ("$.connEndPoints[1].ltp.id", "connEndPoints", "mismatch"),
+        ("$.routingCriteria", "routingCriteria", "mismatch"),
+        ("$.extra", "extra", "unexpected"),
+    ]
+    assert differences[0]["expected"] == 2301 and differences[0]["actual"] == 1
+
+
+def test_missing_values_and_deep_payloads():
+    assert structural_diff({"a": [1]}, {"a": [1, 2], "b": {"c": 0}}) == [
+        {"path": "$.a[1]", "field": "a", "kind": "missing", "expected": 2, "actual": None},
+        {"path": "$.b", "field": "b", "kind": "missing", "expected": {"c": 0}, "actual": None},
+    ]
+    assert structural_diff({"a": True}, {"a": 1})[0]["kind"] == "mismatch"
+
+    # Far deeper than the recursion limit
+    data, ground_truth = {}, {}
+    for _ in range(5000):
+        data, ground_truth = {"x": [data]}, {"x": [ground_truth]}
+    ground_truth_leaf = ground_truth
+    while ground_truth_leaf:
+        ground_truth_leaf = ground_truth_leaf["x"][0]
+    ground_truth_leaf["y"] = 1
+    differences = structural_diff(data, ground_truth)
+    assert len(differences) == 1 and differences[0]["path"].endswith(".x[0].y")
@@ -0,0 +1,56 @@
+import json
+from contextlib import nullcontext
+
+from llm_orchestrator.fake_llm import FakeLLMInterface
+from llm_orchestrator.telemetry import Telemetry
+from llm_orchestrator.timing import StageTimer
+
+
+def test_calls_are_recorded(tmp_path):
+    log_path = tmp_path / "telemetry.jsonl"
+    telemetry = Telemetry(str(log_path))
+    interface = FakeLLMInterface(lambda prompt: "0123456789ab", telemetry=telemetry, role="planner")
+    interface.set_prefix("[INST]system")
+    output = interface.generate(interface.tokenize("[INST]system prompt[/INST]"), grammar=object())
+    assert output["choices"][0]["text"] == "0123456789ab"
+    telemetry.close()
+
+    record = json.loads(log_path.read_text())
+    assert record["role"] == "planner"
+    assert record["grammar"] is True
+    assert record["prompt_tokens"] == 7
+    assert record["reused_tokens"] == 3
+    assert record["completion_tokens"] == 3
+
+    metrics = telemetry.prometheus()
+    assert 'llm_requests_total{role="planner",cache="off"} 1' in metrics
+    assert 'llm_prefill_seconds_count{role="planner"} 1' in metrics
+    assert 'llm_decode_seconds_bucket{role="planner",grammar="true",le="+Inf"} 1' in metrics
+
+
+def test_stages_are_exported_and_traced():
+    telemetry = Telemetry()
+    spans = []
+    telemetry.add_tracer(lambda name, attributes: spans.append(name) or nullcontext())
+    timer = StageTimer()
+    telemetry.register_timer("executor", timer)
+    with timer.stage("generate"):
+        pass
+    assert spans == ["executor.generate"]
+    assert 'llm_stage_calls_total{component="executor",stage="generate"} 1' in telemetry.prometheus()
+
+
+def test_scrape_while_stages_are_added():
+    class GrowingTotals(dict):
+        # Adds a stage while being iterated, as a pipeline thread would during a scrape
+        def items(self):
+            for item in super().items():
+                self[f"stage_{len(self)}"] = 0.0
+                yield item
+
+    telemetry = Telemetry()
+    timer = StageTimer()
+    timer.record("generate", 0.5)
+    timer.totals = GrowingTotals(timer.totals)
+    telemetry.register_timer("executor", timer)
+    assert 'llm_stage_seconds_total{component="executor",stage="generate"} 0.5' in telemetry.prometheus()
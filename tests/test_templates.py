@@ -0,0 +1,63 @@
+from llm_orchestrator.templates import TemplateEngine
+from llm_orchestrator.verifier import Verifier
+
+
+def test_connection_template():
+    templates = TemplateEngine(Verifier(schema_dir="data/json_schemas"))
+    task = {
+        "task": "Service-1Gb",
+        "description": "Create a service between Node1 and Node2. Requirements: service name is 'S-Node1-Node2', "
+        "service is protected, service has 10Gb rate, configuration state is defined.",
+        "source_id": 2272,
+        "sink_id": 2300,
+    }
+    command = templates.build(task)
+    assert command["name"] == "S-Node1-Node2"
+    assert command["protection"] is True
+    assert command["connLps"] == [{"className": "ConnLpEthCbr", "rate": "10Gb"}]
+    assert command["configurationState"] == "defined"
+    assert [end["ltp"]["id"] for end in command["connEndPoints"]] == [2272, 2300]
+
+
+def test_unresolved_tasks_are_left_to_the_llm():
+    templates = TemplateEngine(Verifier(schema_dir="data/json_schemas"))
+    description = "Create a lightpath from Node1 to Node2. Requirements: name is 'LP-Node1-Node2'"
+    # No interface IDs
+    assert templates.build({"task": "Lightpath", "description": description}) is None
+    # Requirement not modelled by the template
+    task = {"task": "Lightpath", "description": description + ", FEC is rsFec", "source_id": 1, "sink_id": 2}
+    assert templates.build(task) is None
+    assert templates.build({"task": "Measurement", "description": "Monitor the lightpath."}) is None
+
+
+def test_ambiguous_protection_and_state_are_left_to_the_llm():
+    templates = TemplateEngine(Verifier(schema_dir="data/json_schemas"))
+    task = {"task": "Lightpath", "source_id": 1, "sink_id": 2}
+    base = "Create a lightpath from Node1 to Node2, named 'LP-Node1-Node2'"
+    for requirement in ["protection should be disabled", "protection is false", "protection isn't needed"]:
+        assert templates.build(dict(task, description=f"{base}, {requirement}.")) is None
+    description = f"{base}, routed according to the byHops routing criteria."
+    assert templates.build(dict(task, description=description)) is None
+
+    command = templates.build(dict(task, description=f"{base}, the lightpath is not protected."))
+    assert command["protection"] is False and command["configurationState"] == "implemented"
+    command = templates.build(dict(task, description=f"{base}, protected, with the state set as routed."))
+    assert command["protection"] is True and command["configurationState"] == "routed"
+
+
+def test_ambiguous_routing_and_monitoring_are_left_to_the_llm():
+    templates = TemplateEngine(Verifier(schema_dir="data/json_schemas"))
+    task = {"task": "Lightpath", "source_id": 1, "sink_id": 2}
+    base = "Create a lightpath from Node1 to Node2, named 'LP-Node1-Node2'"
+    for requirement in [
+        "route it by length, not by hops",
+        "routing by hops or by administrative cost",
+        "enable 15-minute performance monitoring",
+        "with pm enabled every 24 hours",
+    ]:
+        assert templates.build(dict(task, description=f"{base}, {requirement}.")) is None
+
+    command = templates.build(dict(task, description=f"{base}, unprotected, routing by hops."))
+    assert command["routingCriteria"] == "byHops" and command["protection"] is False
+    command = templates.build(dict(task, description=f"{base}, route it by length."))
+    assert command["routingCriteria"] == "byLength"
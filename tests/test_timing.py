@@ -0,0 +1,12 @@
+from llm_orchestrator.timing import StageTimer
+
+
+def test_percentiles_over_a_bounded_window():
+    timer = StageTimer(max_samples=100)
+    for i in range(1000):
+        timer.record("generate", float(i))
+    assert len(timer.samples["generate"]) == 100
+    assert timer.percentile("generate", 0) == 900.0
+    assert timer.percentile("generate", 50) == 949.0
+    # Totals and counts still cover every call
+    assert timer.counts["generate"] == 1000